@@ -11,55 +11,146 @@ TODO
 ====
 	- 	sanitize linestyle/ls = '-',... vs 'solid','dashed','dashdot','dotted'
 	-	find a way to implement '\!' (negative space) into latex strings to remove that annoying whitespace after a super/sub script
-	- 	need to add loadObj()
 	- 	fix latex output to use the same font
 """
 
-from copy import deepcopy
-# required to make pydocs work
-from decorator import decorator
-import matplotlib
-matplotlib.use('TkAgg')
-# attempt to fix issues with cropping of labels
-from matplotlib import rcParams
-rcParams.update({'figure.autolayout':True})
+from collections import namedtuple
+from contextlib import contextmanager, ExitStack
+from functools import lru_cache, wraps
+from importlib import import_module
+from io import BytesIO
+import os
+import sys
+import threading
 
-# from kaplot.defaults import default
 # from kaplot import defaults as kd
-from .defaults import default
 from . import defaults as kd
-import matplotlib.pyplot as plt
-import pickle
-from scipy.interpolate import UnivariateSpline
-from numpy import linspace
-from matplotlib.ticker import ScalarFormatter
-import numpy as np
+from .settings import settings_store, settingsgroup
+from kaplot_backend import get_backend, output_backend
+
+# matplotlib , numpy and the data submodules are imported by _load() when a plot is first
+# compiled or drawn , building a plot spec imports nothing heavy. scipy is only imported when
+# a layer with spline fits is compiled.
+_LOADED 	= False
+plt 		= None
+_LOAD_LOCK 	= threading.RLock()
+
+def _load_numpy():
+	"""
+	imports numpy into the module namespace
+	"""
+	global np
+	import numpy as np
+	return np
+
+def _load(pyplot=False):
+	"""
+	imports matplotlib , numpy and the data submodules into the module namespace. pyplot is
+	only imported for `pyplot` True , after the backend selected with
+	kaplot_backend.set_backend() was applied , and the kaplot rc settings are applied once.
+	a pyplot imported by the caller keeps its backend.
+	"""
+	global _LOADED , _BOXPLOT_LABELS , matplotlib , rcParams , plt , ScalarFormatter , setp , Figure , \
+		Line2D , LineCollection , FigureCanvasAgg , patheffects , mplstyle , cbook , decimate_series , \
+		histaccumulator , merge_accumulators , aligned_histograms , quantilesketch , merge_sketches , \
+		datasource , resolve_sources , render_many , auto_layout , layout_key , \
+		get_layout , store_layout , apply_layout , restore_layout , layout_pars
+	if _LOADED and (plt is not None or not pyplot):
+		return
+	with _LOAD_LOCK:
+		if pyplot and plt is None:
+			import matplotlib
+			# switching the backend of an imported pyplot closes its figures
+			if get_backend() is not None and 'matplotlib.pyplot' not in sys.modules:
+				matplotlib.use(get_backend())
+			import matplotlib.pyplot as plt
+			# applied once , later rcParams changes of the caller are kept
+			matplotlib.rcParams.update(_RC_SETTINGS)
+		if _LOADED:
+			return
+		_load_numpy()
+		import matplotlib
+		from matplotlib import rcParams
+		from matplotlib.ticker import ScalarFormatter
+		from matplotlib.artist import setp
+		from matplotlib.figure import Figure
+		from matplotlib.lines import Line2D
+		from matplotlib.collections import LineCollection
+		from matplotlib.backends.backend_agg import FigureCanvasAgg
+		from matplotlib import patheffects
+		from matplotlib import style as mplstyle
+		from matplotlib import cbook
+		from .batch import render_many
+		from .decimate import decimate_series
+		from .histogram import histaccumulator, merge_accumulators, aligned_histograms
+		from .sketch import quantilesketch, merge_sketches
+		from .datasource import datasource, resolve_sources
+		from .layout import auto_layout, layout_key, get_layout, store_layout, apply_layout, restore_layout, layout_pars
+		# Axes.boxplot renamed `labels` to `tick_labels` in matplotlib 3.9
+		_BOXPLOT_LABELS = 'tick_labels' if tuple(int(v) for v in matplotlib.__version__.split('.')[:2]) >= (3,9) else 'labels'
+		_LOADED = True
+
+# public names of the submodules , imported on first access
+_LAZY_NAMES = {	'render_many'			:	'batch'		, \
+				'decimate_series'		:	'decimate'	, \
+				'histaccumulator'		:	'histogram'	, \
+				'merge_accumulators'	:	'histogram'	, \
+				'aligned_histograms'	:	'histogram'	, \
+				'quantilesketch'		:	'sketch'	, \
+				'merge_sketches'		:	'sketch'	, \
+				'spline_curves'			:	'spline'	, \
+				'datasource'			:	'datasource', \
+				'rendercache'			:	'cache'		, \
+				'figtemplate'			:	'template'}
+
+def __getattr__(name):
+	if name in _LAZY_NAMES:
+		return getattr(import_module('.' + _LAZY_NAMES[name],__name__),name)
+	raise AttributeError('module %r has no attribute %r' % (__name__,name))
 
 
 __author__		= 'Kamil'
 __version__		= '1.0.8'
 __name__		= 'kaplot'
 
-@decorator
-def check_name(fn,self,*args,**kwargs):
-		"""
-		decorator function for kaplot class. checks if the `name` kwarg is
-		valid and inserts `ind` into the kwarg list. additionally, changes all
-		kwargs to be lower case.
-		** args **
-		fn 	- function
-		"""
+# rc settings kaplot draws with. pyplot mode applies them globally once , when pyplot
+# is loaded , figure mode only inside the rc context of its own figure.
+_RC_SETTINGS = {	# attempt to fix issues with cropping of labels
+					'figure.autolayout'	:	True 							, \
+					# used to make latex output same font
+					'font.family'		:	'sans-serif'					, \
+					'font.sans-serif'	:	'Arial, Helvetica, sans-serif'	, \
+					'mathtext.default'	:	'regular'}
+# matplotlib keeps a single, process wide, rcParams. figure mode holds this lock
+# while it works inside its rc context , so its makePlot() and saveMe() calls from
+# several threads run one at a time.
+_RC_LOCK = threading.RLock()
+
+def check_name(fn):
+	"""
+	decorator function for kaplot class. checks if the `name` kwarg is
+	valid and inserts `ind` into the kwarg list. additionally, changes all
+	kwargs to be lower case.
+	** args **
+	fn 	- function
+	"""
+	# wraps keeps the signature and docstring of `fn` for pydoc
+	@wraps(fn)
+	def checked(self,*args,**kwargs):
 		if 'name' not in kwargs:
 				kwargs['name'] = 'main'
 		if kwargs['name'].lower() in self._LAYER_NAMES:
 			oind = self._LAYER_NAMES.index(kwargs['name'].lower())
 			kwargs['ind'] = oind
+			# the layer is about to change, drop the compiled render plan
+			self._PLAN = None
 			# rebuild kwargs
 			new_kwargs = {}
 			for key,val in kwargs.items():
 				new_kwargs[key.lower()] = val
 			return fn(self,*args,**new_kwargs)
 		raise AttributeError('No layer/axes named %s' % kwargs['name'])
+	return checked
 
 class kaplot(object):
 	"""
@@ -74,38 +165,63 @@ class kaplot(object):
 	each LAYER can have any number of features added to it.
 	"""
 
-	# used to make latex output same font
-	matplotlib.rcParams['font.family'] 		= 'sans-serif'
-	matplotlib.rcParams['font.sans-serif']	= 'Arial, Helvetica, sans-serif'
-	matplotlib.rcParams['mathtext.default']	= 'regular'
-
 	LAYER_SETTINGS		=	{ 	'twin'			:	None 	, \
 								'twin_ref'		:	None}
 	# do not add to label/legend if the value exists
 	SKIP_LABELS	 		= 	['_nolegend_']
 
-	def __init__(self,settings=None,mpobj=None):
+	def __init__(self,settings=None,mpobj=None,pyplot=True):
 		'''Make `kaplot` object: list of layers and associated properties. Also allows for dictionary,
-		or list of dictionaries, to be passed as `settings` to adjust plot settings.'''
+		or list of dictionaries, to be passed as `settings` to adjust plot settings.
+		With `pyplot` False the object never touches pyplot or the global rcParams; it draws
+		into its own Figure with an Agg canvas, so several objects can render from different threads.
+		This is thread-safe but not parallel : matplotlib reads its process wide rcParams while
+		drawing, so the drawing and saving of figure mode objects runs one at a time. Use
+		kaplot.render_many() to render in parallel.'''
 		self.GLOBAL_MPOBJ		= None
+		self.FIGURE				= None
+		self._PYPLOT			= pyplot
 		self._SAVED				= None
+		self._PLAN				= None
 		self._LAYER_NAMES		= []
 		self._LAYER_OBJECTS		= []
 		self._LAYER_SETTINGS	= []
 		self._LAYER_PLT_OBJECT	= []
+		# per layer , data set index -> (spline line , line) drawn by makePlot()
+		self._LIVE				= []
+		self._BACKGROUND		= {}
 		self._LAYER_NAMES.append('main')
-		self._LAYER_OBJECTS.append(deepcopy(kaxes()))
-		self._LAYER_SETTINGS.append(deepcopy(self.LAYER_SETTINGS))
+		self._LAYER_OBJECTS.append(kaxes())
+		self._LAYER_SETTINGS.append(dict(self.LAYER_SETTINGS))
 		# Add settings
 		self.load_settings(settings)
+		if not pyplot:
+			if mpobj is not None:
+				mpobj.cla()
+				self.GLOBAL_MPOBJ = mpobj
+			return
+		_load(pyplot=True)
 		if mpobj == None:
+			# makePlot() adds the axes , an axes made here by cla() would stay empty behind them
 			plt.clf()
-			plt.cla()
 		else:
 			plt.cla()
 			self.GLOBAL_MPOBJ = mpobj
 		return
 
+	def __getstate__(self):
+		# blitting backgrounds are canvas buffers , rebuilt by the next update_plotdata()
+		state = dict(self.__dict__)
+		state['_BACKGROUND'] = {}
+		return state
+
+	def __setstate__(self,state):
+		self.__dict__.update(state)
+		# settings groups copied onto the object are bound to it again
+		for key,value in state.items():
+			if isinstance(value,settingsgroup):
+				self.__dict__[key] = value.bind(self,key)
+
 	def load_settings(self,settings):
 		"""
 		Reads the settings from `settings`, adds default settings from kaplot.defaults.default,
@@ -114,32 +230,36 @@ class kaplot(object):
 		of the list. It may also be a single or list of strings, in which case kaplot will try to import from
 		kaplot.defaults.
 		"""
+		self._PLAN = None
 		if not settings:
-			# nothing custom was passed
-			for key,value in default.items():
-				setattr(self,key,value)
-			return
-		# otherwise there are at least 1 additional settings provided in `settings`
-		# since not all groups of settings might be updated, we loop through the default settings,
-		# update that group's dictionary with override settings, if present, and add to `self`.
-		# Note that some entries in the settings/default dictionary are actually lists. For those
-		# we simply overwrite.
-		if type(settings) != type([]):
+			settings = []
+		elif type(settings) != type([]):
 			settings = [settings,]
-		for key,value in default.items():
-			for setting in settings:
-				if type(setting) == type(''):
-					try:
-						setting = getattr(kd,setting)
-					except AttributeError:
-						raise AttributeError('%s not found in kaplot.defaults or .kaplotdefaults.rc' % setting)
-				if key in setting:
-					if type(value) == type({}):
-						value.update(setting[key])
-					else:
-						value = deepcopy(setting[key])
-				# else, we're just using the default value anyway
-			setattr(self,key,value)
+		# profile names are resolved against the current user settings files , stacks of
+		# names share one frozen store. groups changed by the setters of a previous
+		# load_settings are dropped
+		stamp = kd.rc_stamp()
+		self._STORE = settings_store(kd.profile('default',stamp),settings,lambda name : kd.profile(name,stamp),stamp)
+		for key in self._STORE.groups():
+			self.__dict__.pop(key,None)
+
+	def __getattr__(self,name):
+		# settings groups , resolved from the store. guarded so copy and pickle , which look
+		# up attributes before __dict__ is filled , get an AttributeError
+		store = self.__dict__.get('_STORE')
+		if store is None or name not in store:
+			raise AttributeError(name)
+		value = store.get(name)
+		if isinstance(value,settingsgroup):
+			return value.bind(self,name)
+		return value
+
+	def _set_setting(self,group,key,value):
+		"""
+		sets `key` of the settings group `group` on this object only , copy-on-write
+		"""
+		self.__dict__[group] = getattr(self,group).replace(**{key : value}).bind(self,group)
+		self._PLAN = None
 
 	def set_style(self,mpl_style):
 		"""
@@ -147,7 +267,7 @@ class kaplot(object):
 		** args **
 		mpl_style 	- valid style name
 		"""
-		self.PLOT_SETTINGS['style'] = mpl_style
+		self._set_setting('PLOT_SETTINGS','style',mpl_style)
 		return
 
 	def set_tight(self,tl_bool):
@@ -158,7 +278,20 @@ class kaplot(object):
 		tl_bool 	- True/False for tight layout
 		"""
 		if type(tl_bool) is type(True):
-			self.PLOT_SETTINGS['tight_layout'] = tl_bool
+			self._set_setting('PLOT_SETTINGS','tight_layout',tl_bool)
+		return
+
+	def set_layout_cache(self,lc_bool):
+		"""
+		updates the layout cache boolean. with the cache on, the tight layout of a figure is
+		reused by figures with the same labels, fonts, tick labels, size and layer
+		locations (see kaplot.layout)
+
+		** args **
+		lc_bool 	- True/False for the layout cache
+		"""
+		if type(lc_bool) is type(True):
+			self._set_setting('PLOT_SETTINGS','layout_cache',lc_bool)
 		return
 
 	def set_xkcd(self,xk_bool):
@@ -169,7 +302,7 @@ class kaplot(object):
 		xk_bool 	- True/False for xkcd mode
 		"""
 		if type(xk_bool) is type(True):
-			self.PLOT_SETTINGS['xkcd'] = xk_bool
+			self._set_setting('PLOT_SETTINGS','xkcd',xk_bool)
 		return
 
 	def add_layer(self,name,location=None,twin=None,twin_ref='main'):
@@ -190,11 +323,12 @@ class kaplot(object):
 			k.set_location(location)
 			self._LAYER_OBJECTS.append(k)
 			# add layer settings
-			tmp = deepcopy(self.LAYER_SETTINGS)
+			tmp = dict(self.LAYER_SETTINGS)
 			if twin is not None and twin.lower() in ['x', 'y']:
 				tmp['twin']		= twin.lower()
 				tmp['twin_ref']	= twin_ref.lower()
 			self._LAYER_SETTINGS.append(tmp)
+			self._PLAN = None
 		else:
 			print('kaplot: add_layer error. layer exists.')
 		return
@@ -669,6 +803,82 @@ class kaplot(object):
 		k.set_unique_colors(ubool,kwargs['cmap'])
 		return
 
+	@check_name
+	def set_decimate(self,method,**kwargs):
+		"""
+		decimates the line data of the layer before drawing. the number of points kept
+		follows the figure width and dpi of SAVEFIG_SETTINGS , can be overridden per
+		data set with the `decimate` kwarg of add_plotdata(). the decimated line keeps the
+		shape and extremes of the data but is not pixel exact , see kaplot.decimate
+
+		** args **
+		method 	- 'minmax' (keeps the extremes of each pixel column) , 'lttb' (largest triangle three buckets) or None
+
+		** kwargs **
+		name 	- layer name
+		"""
+		from .decimate import METHODS as DECIMATE_METHODS
+		if method is None or method in DECIMATE_METHODS:
+			k = self._LAYER_OBJECTS[kwargs['ind']]
+			k.set_decimate(method)
+		else:
+			print('kaplot: set_decimate error. method must be None, %s.' % ', '.join(DECIMATE_METHODS))
+		return
+
+	@check_name
+	def set_boxscatter(self,seed=0,max_points=None,**kwargs):
+		"""
+		sets how the points of a boxscatter layer are drawn
+
+		** kwargs **
+		name 		- layer name
+		seed 		- seed for the position jitter and subsampling , None for a new random
+					  jitter on every render
+		max_points 	- maximum number of scattered points per box , larger groups are
+					  subsampled evenly across their sorted values. None draws all points
+		"""
+		k = self._LAYER_OBJECTS[kwargs['ind']]
+		k.set_boxscatter(seed,max_points)
+		return
+
+	@check_name
+	def set_line_collection(self,cbool,label=None,**kwargs):
+		"""
+		draws the line data of the layer as LineCollection(s) instead of one artist per
+		data set. data sets sharing the line style (ls, lw, alpha) are packed into a single
+		collection, colored from the color list or set_unique_colors(). markers are not
+		assigned automatically in this mode ; data sets with markers, error bars or
+		other line kwargs are drawn on their own.
+
+		** args **
+		cbool 	- True/False for collection mode
+
+		** kwargs **
+		name 	- layer name
+		label 	- legend label of the whole collection. data set labels passed to
+				  add_plotdata() are added to the legend as well
+		"""
+		k = self._LAYER_OBJECTS[kwargs['ind']]
+		k.set_line_collection(cbool,label)
+		return
+
+	@check_name
+	def set_float32(self,fbool,**kwargs):
+		"""
+		stores the numeric data of the data sets of the layer as float32 arrays , which
+		halves their memory. the data is converted when the layer is next compiled
+		(compilePlot() / makePlot()) , float32 arrays are kept without a copy.
+
+		** args **
+		fbool 	- True/False for float32 storage
+
+		** kwargs **
+		name 	- layer name
+		"""
+		k = self._LAYER_OBJECTS[kwargs['ind']]
+		k.set_float32(fbool)
+		return
+
 	@check_name
 	def add_axhline(self,location,**kwargs):
 		"""
@@ -755,13 +965,17 @@ class kaplot(object):
 		return
 
 	@check_name
-	def add_plotdata(self,x,y,**kwargs):
+	def add_plotdata(self,x=None,y=None,**kwargs):
 		"""
 		adds plot data to the layer
 
 		** args **
 		x 			- x data array/list
-		y 			- y data array/list
+		y 			- y data array/list , may be omitted for pre-binned histogram data.
+					  hist layers also accept a kaplot.histogram.histaccumulator ,
+					  boxplot layers a kaplot.sketch.quantilesketch.
+					  x and y may be kaplot.datasource.datasource objects , file backed
+					  data which is memory-mapped when the plot is made
 
 		** kwargs **
 		name 		- layer name
@@ -791,6 +1005,9 @@ class kaplot(object):
 		sp_smooth 	- smoothing parameter, if None the spline will pass through all values
 		sp_points 	- use #points between xmin/xmax
 
+		** decimation kwargs **
+		decimate 	- 'minmax' , 'lttb' or False , overrides set_decimate() for this data set
+
 		** bar chart kwargs **
 		edgecolor	- edge color
 		align		- alignment (center or left)
@@ -805,6 +1022,10 @@ class kaplot(object):
 		** histogram chart kwargs **
 		http://matplotlib.org/api/pyplot_api.html#matplotlib.pyplot.hist
 		bins		- bins to uses during binning
+		counts 		- pre-binned data : counts per bin, drawn instead of binning y
+		edges 		- pre-binned data : bin edges, len(counts) + 1 values.
+					  all pre-binned data sets of a layer must share the same edges,
+					  raw data sets on the layer are binned with these edges
 		min 		- lower value for bins, less than min are ignored
 		max 		- upper value for bins, grather than max are ignored
 		normed 		- True/False : normalize the values, integral is 1
@@ -851,6 +1072,129 @@ class kaplot(object):
 		k.add_plotdata(**kwargs)
 		return
 
+	@check_name
+	def update_plotdata(self,x=None,y=None,index=-1,**kwargs):
+		"""
+		replaces the data of a data set added with add_plotdata(). once the figure is drawn,
+		the lines of a line layer are updated in place : the new data is set on the existing
+		line and only the axes holding it is redrawn , with blitting when the canvas supports
+		it. automatic axes limits grow with the data , which redraws the whole figure.
+		other plot types , error bars and line collections show the new data after the next
+		makePlot().
+
+		** args **
+		x 		- new x data , None keeps the current values
+		y 		- new y data , None keeps the current values
+
+		** kwargs **
+		name 	- layer name
+		index 	- position of the data set in the layer , in add_plotdata() order. defaults
+				  to the last data set
+		xerr 	- new x-error data
+		yerr 	- new y-error data
+		"""
+		ind 	= kwargs.pop('ind')
+		name 	= kwargs.pop('name')
+		artists = self._update_series(ind,name,x,y,index,**kwargs)
+		if artists:
+			self._redraw_live(ind,artists)
+		return
+
+	def _update_series(self,ind,name,x,y,index,**kwargs):
+		"""
+		replaces the data set `index` of layer `ind` and sets the new data on its drawn lines.
+		returns the changed lines , an empty list when nothing drawn changed
+		"""
+		k 		= self._LAYER_OBJECTS[ind]
+		if not -len(k.DATA_LIST) <= index < len(k.DATA_LIST):
+			print('kaplot: update_plotdata error. layer %s has no data set %s.' % (name,index))
+			return []
+		index = index % len(k.DATA_LIST)
+		if x is not None:
+			kwargs['x'] = x
+		if y is not None:
+			kwargs['y'] = y
+		pd 		= k.update_plotdata(index,**kwargs)
+		lives 	= getattr(self,'_LIVE',[])
+		live 	= lives[ind].get(index) if ind < len(lives) else None
+		if live is None:
+			return []
+		spline , line = live
+		if has_errors(pd):
+			print('kaplot: update_plotdata error. error bars are only updated by makePlot().')
+			return []
+		pd 		= resolve_sources(pd,k.SETTINGS['x_limit'])
+		npd 	= update_default_kwargs(self._LINE_DEFAULTS,pd)
+		if spline is not None:
+			from .spline import spline_curves
+			spline.set_data(*spline_curves([(npd['x'],npd['y'],npd['sp_order'],npd['sp_smooth'],npd['sp_points'])])[0])
+		method 	= npd.get('decimate',k.SETTINGS['decimate'])
+		if method:
+			ncols 	= self.SAVEFIG_SETTINGS['width']*self.SAVEFIG_SETTINGS['dpi']
+			npd 	= decimate_series(npd,method,ncols,pd.get('_finite'))
+		line.set_data(npd['x'],npd['y'])
+		return [a for a in live if a is not None]
+
+	def _live_artists(self,ind):
+		"""
+		returns the lines of layer `ind` which update_plotdata() changes in place
+		"""
+		return [a for live in self._LIVE[ind].values() for a in live if a is not None]
+
+	def _redraw_live(self,ind,artists):
+		"""
+		redraws the axes of layer `ind` after its lines `artists` changed. when the data left
+		the automatic axes limits , the limits are updated and the figure is redrawn.
+		otherwise the background of the axes (without its live lines) is restored and only
+		the live lines of the axes, and of the layers sharing its area, are drawn on top.
+		"""
+		ax 		= self._LAYER_PLT_OBJECT[ind]
+		canvas 	= ax.figure.canvas
+		# figure mode draws within the rc settings of the drawn plan
+		rc 		= figure_rc(self._DRAWN) if not self._PYPLOT else ExitStack()
+		if outside_view(ax,artists):
+			ax.relim()
+			ax.autoscale_view()
+			with rc:
+				canvas.draw_idle()
+			return
+		if not hasattr(canvas,'copy_from_bbox'):
+			with rc:
+				canvas.draw_idle()
+			return
+		group 	= [i for i,a in enumerate(self._LAYER_PLT_OBJECT) if a.bbox.bounds == ax.bbox.bounds]
+		bg 		= self._BACKGROUND.get(ax.bbox.bounds)
+		if bg is None:
+			# the background is the figure drawn without the live lines. the draw may move
+			# the axes (layout) , the layers sharing the area are found again afterwards
+			live = [a for i in group for a in self._live_artists(i)]
+			for a in live:
+				a.set_visible(False)
+			with rc:
+				canvas.draw()
+			group 	= [i for i,a in enumerate(self._LAYER_PLT_OBJECT) if a.bbox.bounds == ax.bbox.bounds]
+			# the legends are pasted back over the lines , instead of being drawn again
+			legends = [self._LAYER_PLT_OBJECT[i].get_legend() for i in group]
+			legends = [canvas.copy_from_bbox(leg.get_window_extent()) for leg in legends if leg is not None]
+			bg 		= (canvas.copy_from_bbox(ax.bbox),legends)
+			for a in live:
+				a.set_visible(True)
+			self._BACKGROUND[ax.bbox.bounds] = bg
+		canvas.restore_region(bg[0])
+		for i in group:
+			lax = self._LAYER_PLT_OBJECT[i]
+			for a in self._live_artists(i):
+				lax.draw_artist(a)
+		for region in bg[1]:
+			canvas.restore_region(region)
+		canvas.blit(ax.bbox)
+		canvas.flush_events()
+		return
+
+	def _clear_backgrounds(self,event=None):
+		# any full draw (resize, limits , makePlot) invalidates the blitting backgrounds
+		self._BACKGROUND = {}
+
 	@check_name
 	def add_rectangle(self,top,bottom,**kwargs):
 		"""
@@ -921,482 +1265,624 @@ class kaplot(object):
 		k.add_arrow(**kwargs)
 		return
 
-	def makePlot(self):
-		"""
-		generates the matplotlib object from all inputs
-		"""
-		## helper
-		def color_marker_fill_index(cnt,clist,mlist,flist):
-			"""
-			helper function which uses the cnt number to determine which
-			color , marker , fill will be used
-
-			** args **
-			cnt 	- integer number
+	def compilePlot(self):
+		"""
+		resolves every layer into a render plan. defaults, styles and plot type specific
+		arguments are merged once and stored as an ordered tuple of draw calls per layer.
+		the layer specs are left untouched and the plan is cached until the object is
+		modified, so it can be rendered by makePlot() any number of times.
+
+		returns a `renderplan` tuple
+		"""
+		_load()
+		if self._PLAN is None:
+			layers = []
+			for i in range(len(self._LAYER_NAMES)):
+				layers.append(self._compile_layer(i))
+			self._PLAN = renderplan(style=self.PLOT_SETTINGS['style'],xkcd=self.PLOT_SETTINGS['xkcd'],layers=tuple(layers))
+		return self._PLAN
+
+	def _compile_layer(self,ind):
+		"""
+		builds the `layerplan` for the layer at index `ind`
+		"""
+		name 	= self._LAYER_NAMES[ind]
+		k 		= self._LAYER_OBJECTS[ind]
+		setting = self._LAYER_SETTINGS[ind]
+		calls 	= []
+		k.store_columns()
+		# AXES PLACEMENT
+		twin , twin_ref , loc_cor = None , None , None
+		if setting['twin'] is not None:
+			twin 		= setting['twin']
+			twin_ref 	= self._LAYER_NAMES.index(setting['twin_ref'])
+		elif k.SETTINGS['location'] is not None:
+			loc_txt = k.SETTINGS['location']
+			if type(loc_txt) is type([]):
+				loc_cor = loc_txt
+			elif self.PLOT_SETTINGS['tight_layout']:
+				loc_cor = self._LOCATION_TIGHT[loc_txt]
+			else:
+				loc_cor = self._LOCATION[loc_txt]
+			loc_cor = tuple(loc_cor)
+		# AXES TYPE AND BASE SETTING
+		if k.SETTINGS['axes_type'] in ['log-log','semilog-x','semilog-y']:
+			if k.SETTINGS['axes_type'] == 'log-log':
+				calls.append(plan_call('set_xscale','log',basex=k.SETTINGS['x_base']))
+				calls.append(plan_call('set_yscale','log',basey=k.SETTINGS['y_base']))
+			elif k.SETTINGS['axes_type'] == 'semilog-y':
+				calls.append(plan_call('set_yscale','log',basey=k.SETTINGS['y_base']))
+			else:
+				calls.append(plan_call('set_xscale','log',basex=k.SETTINGS['x_base']))
+		else:
+			calls.append(plan_call('set_xscale','linear'))
+			calls.append(plan_call('set_yscale','linear'))
+			## Format Helper
+			## 5/17/2017 - kamil - after struggling with the axis formatting, this seemed to fix things, it's not robust nor has it been tested
+			calls.append(plan_call('_formatter'))
+		# TITLE
+		if k.SETTINGS['title'] is not None:
+			calls.append(plan_call('set_title',k.SETTINGS['title'],**k.SETTINGS['title_prop']))
+		# GRID
+		if k.SETTINGS['grid_bool']:
+			calls.append(plan_call('grid',**k.SETTINGS['grid_prop']))
+		# ADD PLOTDATA
+		series 	= []
+		if len(k.DATA_LIST) != 0:
+			start 	= len(calls)
+			calls.extend(self._compile_data(k,series))
+			series 	= [(index,sp_call if sp_call is None else sp_call + start,line_call + start) for index,sp_call,line_call in series]
+		# AXES LABELS, TICKS, FORMATTING, and PARAMETERS
+		if k.SETTINGS['xlabel'] is not None:
+			calls.append(plan_call('set_xlabel',k.SETTINGS['xlabel'],**k.SETTINGS['xlab_prop']))
+		if k.SETTINGS['ylabel'] is not None:
+			calls.append(plan_call('set_ylabel',k.SETTINGS['ylabel'],**k.SETTINGS['ylab_prop']))
+		if k.SETTINGS['xticks'] is not None:
+			calls.append(plan_call('set_xticks',k.SETTINGS['xticks']))
+			calls.append(plan_call('set_xticklabels',k.SETTINGS['xtick_labels'],**k.SETTINGS['xtick_prop']))
+		elif k.SETTINGS['xtick_prop'] is not None:
+			# change settings even if no ticks are specified
+			calls.append(plan_call('_ticklabels','x',**k.SETTINGS['xtick_prop']))
+		if k.SETTINGS['yticks'] is not None:
+			calls.append(plan_call('set_yticks',k.SETTINGS['yticks']))
+			calls.append(plan_call('set_yticklabels',k.SETTINGS['ytick_labels'],**k.SETTINGS['ytick_prop']))
+		elif k.SETTINGS['ytick_prop'] is not None:
+			# change settings even if no ticks are specified
+			calls.append(plan_call('_ticklabels','y',**k.SETTINGS['ytick_prop']))
+		for axis,params in [('x',k.XTICK_PARAM),('y',k.YTICK_PARAM)]:
+			if params is not None:
+				params = dict(params)
+				if 'maxticks' in params:
+					calls.append(plan_call('locator_params',axis=axis,nbins=params.pop('maxticks')))
+				calls.append(plan_call('tick_params',axis=axis,**params))
+		# AXES LIMITS
+		if k.SETTINGS['x_limit'] is not None:
+			xmin , xmax = k.SETTINGS['x_limit']
+			if xmin is not None:
+				calls.append(plan_call('set_xlim',left=xmin))
+			if xmax is not None:
+				calls.append(plan_call('set_xlim',right=xmax))
+		if k.SETTINGS['y_limit'] is not None:
+			ymin , ymax = k.SETTINGS['y_limit']
+			if ymin is not None:
+				calls.append(plan_call('set_ylim',bottom=ymin))
+			if ymax is not None:
+				calls.append(plan_call('set_ylim',top=ymax))
+		# FRAME ELEMENTS
+		for side in ['top','bottom','right','left']:
+			if not k.FRAMES[side]:
+				calls.append(plan_call('_spine',side))
+		# ADD AXHLINE
+		for ax in k.AXHLINE_LIST:
+			calls.append(plan_call('_axhline',**ax))
+		# ADD AXVLINE
+		for ax in k.AXVLINE_LIST:
+			calls.append(plan_call('_axvline',**ax))
+		# ADD TEXT
+		for txt in k.TEXT_LIST:
+			tdict = dict(txt)
+			tdict['s'] = tdict.pop('txt')
+			calls.append(plan_call('text',**tdict))
+		# ADD RECTANGLE
+		if len(k.RECT_LIST) != 0:
+			styles = style_table([rd['increment'] for rd in k.RECT_LIST],self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST,k.SETTINGS['uniq_cols'],k.SETTINGS['color_map'])
+			for rd,(color,h,fill) in zip(k.RECT_LIST,styles):
+				rd = dict(rd)
+				rd.pop('increment')
+				# do not overwrite user specified values
+				rd.setdefault('color',color)
+				rd.setdefault('hatch',h)
+				rd.setdefault('fill',fill)
+				calls.append(plan_call('_axhspan',**rd))
+		# ADD ARROW
+		if len(k.ARROW_LIST) != 0:
+			print('adding arrows')
+			for ad in k.ARROW_LIST:
+				calls.append(plan_call('arrow',**ad))
+		# ADD LEGEND
+		# -- needs to go last, otherwise possible 'no label situation'
+		if k.SETTINGS['leg_props'] is not None and k.SETTINGS['leg_props']['bool']:
+			props = dict(k.SETTINGS['leg_props'])
+			props.pop('bool')
+			calls.append(plan_call('_legend',k.SETTINGS['leg_fprop'],**props))
+		return layerplan(name=name,twin=twin,twin_ref=twin_ref,location=loc_cor,calls=tuple(calls),series=tuple(series))
+
+	def _compile_data(self,k,series=None):
+		"""
+		merges the plot data of layer `k` with the plot type defaults and resolves the
+		color , marker , fill and hatch of each entry. for line layers the list `series`
+		receives a (data set index , spline call index , line call index) tuple for every
+		data set drawn as its own line.
+
+		returns a list of draw calls
+		"""
+		if series is None:
+			series = []
+		calls 	= []
+		ptype 	= k.SETTINGS['plot_type']
+		# pixel columns available to a line
+		ncols 	= self.SAVEFIG_SETTINGS['width']*self.SAVEFIG_SETTINGS['dpi']
+		# update plt settings
+		data_list = []
+		for pd in k.DATA_LIST:
+			# file backed data is mapped now , sorted line data is culled to the x limits
+			pd = resolve_sources(pd,k.SETTINGS['x_limit'] if ptype == 'line' else None)
+			if ptype == 'line':
+				npd 			= update_default_kwargs(self._LINE_DEFAULTS,pd)
+			elif ptype == 'bar':
+				npd 			= update_default_kwargs(self._BAR_DEFAULTS,pd)
+				npd['x']		= pd['x']
+				npd['height']	= pd['y']
+			elif ptype == 'hist':
+				npd 			= update_default_kwargs(self._HIST_DEFAULTS,pd)
+				npd['x']		= pd['y']
+				if 'min' in npd.keys() or 'max' in npd.keys():
+					npd['range'] = [None,None]
+					if 'min' in npd.keys():
+						npd['range'][0] = npd.pop('min')
+					if 'max' in npd.keys():
+						npd['range'][1] = npd.pop('max')
+			elif ptype in ['boxplot', 'boxscatter']:
+				npd 			= update_default_kwargs(self._BOXPLOT_DEFAULTS,pd)
+				npd['boxscatter'] = update_default_kwargs(self._BOXSCATTER_DEFAULTS,{})
+				npd['x']		= pd['y']
+			# mask of the finite points , only stored when some are not
+			if '_finite' in pd and (ptype == 'line' or pd.get('x') is None):
+				npd['_finite'] = pd['_finite']
+			data_list.append(npd)
+		# generate color,marker,fill list for the plot
+		increments 	= [pd['increment'] for pd in data_list]
+		uniq 		= k.SETTINGS['uniq_cols']
+		cmap 		= k.SETTINGS['color_map']
+		if ptype == 'line':
+			# the legend lists plain lines before errorbar containers, so labelled data sets
+			# only skip errorbar() when no data set of the layer has error bars
+			no_err = not any(has_errors(pd) for pd in data_list)
+			# data sets packed into line collections , grouped by line style
+			coll 	= k.SETTINGS['collection']
+			groups 	= {}
+			# all spline fits of the layer at once
+			splines = [(pd['x'],pd['y'],pd['sp_order'],pd['sp_smooth'],pd['sp_points']) for pd in data_list if pd['spline']]
+			if splines:
+				# scipy is only imported by layers with spline fits
+				from .spline import spline_curves
+				splines = spline_curves(splines)
+			splines = iter(splines)
+			styles 	= style_table(increments,self._COLOR_LIST,self._MARKER_LIST,self._MARKER_FILL_LIST,uniq,cmap)
+			for index,(pd,(col,mar,fill)) in enumerate(zip(data_list,styles)):
+				if coll:
+					mar , fill = None , None
+				pd.setdefault('color',col)
+				pd.setdefault('marker',mar)
+				pd.setdefault('mfc',fill)
+				# spline portion
+				sp_key 		= ['color','lw','ls']
+				sp_call 	= None
+				if pd['spline']:
+					x_spline , y_spline = next(splines)
+					sp_dict 	= {}
+					for sp in sp_key:
+						if sp in pd:
+							sp_dict[sp] = pd[sp]
+					pd['lw'] = 0
+					pd['ls'] = ''
+					sp_call = len(calls)
+					calls.append(line_call(dict(x=x_spline,y=y_spline,**sp_dict)))
+				for key in ['spline','sp_smooth','sp_order','sp_points','increment']:
+					pd.pop(key)
+				finite = pd.pop('_finite',None)
+				# reduce the points to what the figure can show
+				method = pd.pop('decimate',k.SETTINGS['decimate'])
+				if method:
+					pd = decimate_series(pd,method,ncols,finite)
+				if coll and collection_key(pd) is not None:
+					groups.setdefault(collection_key(pd),[]).append(pd)
+					continue
+				series.append((index,sp_call,len(calls)))
+				calls.append(line_call(pd,no_err or pd['label'] in self.SKIP_LABELS))
+			# the legend lists the collections once , under the label of the first
+			label = k.SETTINGS['coll_label']
+			for key in sorted(groups,key=str):
+				calls.append(collection_call(groups[key],label,self.SKIP_LABELS))
+				if label is not None:
+					label = '_nolegend_'
+		elif ptype == 'bar':
+			styles = style_table(increments,self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST,uniq,cmap)
+			for pd,(col,hat,fill) in zip(data_list,styles):
+				# do not overwrite user specified values
+				pd.setdefault('color',col)
+				pd.setdefault('hatch',hat)
+				pd.setdefault('fill',fill)
+				pd.pop('increment')
+				pd.pop('_finite',None)
+				calls.append(plan_call('bar',**pd))
+		elif ptype == 'hist':
+			x_list		= []
+			counts 		= []
+			edges 		= []
+			labels 		= []
+			colors		= []
+			histargs	= {}
+			styles 		= style_table(increments,self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST,uniq,cmap)
+			for pd,(col,hat,fill) in zip(data_list,styles):
+				pd.pop('increment')
+				# do not overwrite user specified values
+				colors.append(pd.pop('color',col))
+				# data addition
+				x_list.append(finite_data(pd.pop('x'),pd.pop('_finite',None)))
+				counts.append(pd.pop('counts',None))
+				edges.append(pd.pop('edges',None))
+				# data labels
+				label = pd.pop('label','')
+				if label in self.SKIP_LABELS:
+					label = ''
+				labels.append(label)
+				# build large plot args
+				histargs.update(pd)
+			accs = [i for i,x in enumerate(x_list) if isinstance(x,histaccumulator)]
+			if accs:
+				# accumulators are drawn as pre-binned data on one common grid
+				for i,(c,e) in zip(accs,aligned_histograms([x_list[i] for i in accs])):
+					x_list[i] , counts[i] , edges[i] = None , c , e
+			if any(c is not None for c in counts):
+				# pre-binned data, drawn through the weights of the shared bins
+				x_list , weights , bins = prebinned_hist(x_list,counts,edges,histargs.pop('range',None))
+				histargs['weights'] = weights
+				histargs['bins'] 	= bins
+			calls.append(plan_call('hist',x=x_list,label=labels,color=colors,**histargs))
+		elif ptype in ['boxplot', 'boxscatter']:
+			x_list 		= []
+			labels 		= []
+			positions	= []
+			bpargs 		= {}
+			bsargs 		= {}
+			bx_fill_col = []
+			for i,pd in enumerate(data_list):
+				# add data to plot
+				x_list.append(finite_data(pd.pop('x'),pd.pop('_finite',None)))
+				pd.pop('increment')
+				# update colors
+				bx_fill_col.append(pd.pop('box_fill_color','Auto'))
+				# add labels to the data sets
+				label = pd.pop('label',None)
+				if label in self.SKIP_LABELS:
+					label = None
+				labels.append(label)
+				# customize the positions
+				positions.append(pd.pop('loc',i+1))
+				# update bpargs with user passed variabls and preform rename if required
+				bsargs = pd.pop('boxscatter')
+				for key,val in pd.items():
+					if key in ['width','showmean','showcap']:
+						key = key+'s'
+					bpargs[key] = val
+			if ptype != 'boxscatter':
+				bsargs = None
+			scatter = {'seed' : k.SETTINGS['bs_seed'] , 'max_points' : k.SETTINGS['bs_max_points']}
+			calls.append(plan_call('_boxplot',x_list,labels,positions,bx_fill_col,bsargs,scatter,**bpargs))
+		return calls
+
+	def makePlot(self,mpobj=None):
+		"""
+		generates the matplotlib object from all inputs. the render plan from compilePlot()
+		is reused between calls, so the same object may be rendered more than once.
 
-			returns tuple (color_index , marker_index , fill_index)
-			"""
-			cind = cnt%len(clist)
-			mind = (cnt // len(clist)) % len(mlist)
-			find = (cnt // (len(clist)*len(mlist))) % len(flist)
-			return (cind,mind,find)
+		** kwargs **
+		mpobj 	- matplotlib axes object to draw the main layer(s) into, defaults to the
+				  object given to __init__ , or a new axes
+		"""
+		plan = self.compilePlot()
+		if mpobj is None:
+			mpobj = self.GLOBAL_MPOBJ
+		if not self._PYPLOT:
+			with figure_rc(plan):
+				return self._run_plan(plan,mpobj)
 		## PLOTTING PORTION
-		if self.PLOT_SETTINGS['style'] is not None:
-			plt.style.use(self.PLOT_SETTINGS['style'])
-		if self.PLOT_SETTINGS['xkcd']:
+		_load(pyplot=True)
+		if plan.style is not None:
+			plt.style.use(plan.style)
+		if plan.xkcd:
 			plt.xkcd()
-		for i,name in enumerate(self._LAYER_NAMES):
-			name 	= self._LAYER_NAMES[i]
-			k 		= self._LAYER_OBJECTS[i]
-			setting = self._LAYER_SETTINGS[i]
+		return self._run_plan(plan,mpobj)
+
+	def _run_plan(self,plan,mpobj):
+		"""
+		creates the axes of every layer and executes its draw calls
+		"""
+		if mpobj is not None:
+			fig 	= mpobj.figure
+		elif self._PYPLOT:
+			fig 	= plt.gcf()
+		else:
+			fig 	= Figure()
+			FigureCanvasAgg(fig)
+		# a figure drawn before (pyplot figure , `mpobj`) loses the axes of the previous render
+		for ax in self._LAYER_PLT_OBJECT:
+			if ax is mpobj:
+				ax.cla()
+			elif ax.figure is fig:
+				ax.remove()
+		self.FIGURE = fig
+		self._DRAWN = plan
+		self._LAYER_PLT_OBJECT = []
+		self._LIVE = []
+		self._BACKGROUND = {}
+		fig.canvas.mpl_connect('draw_event',self._clear_backgrounds)
+		for lp in plan.layers:
 			# if axes is twin'd
-			if setting['twin'] is not None:
+			if lp.twin is not None:
 				# grab the axes object to copy
-				ind 	= self._LAYER_NAMES.index(setting['twin_ref'])
-				mpobj 	= self._LAYER_PLT_OBJECT[ind]
-				if setting['twin'] == 'x':
-					mpobj = mpobj.twinx()
-				else:
-					mpobj = mpobj.twiny()
-			elif k.SETTINGS['location'] is None:
-				if self.GLOBAL_MPOBJ == None:
-					mpobj 	= plt.axes()
-				else:
-					mpobj 	= self.GLOBAL_MPOBJ
-			else:
-				loc_txt = k.SETTINGS['location']
-				if type(loc_txt) is type([]):
-					loc_cor = loc_txt
-				elif self.PLOT_SETTINGS['tight_layout']:
-					loc_cor = self._LOCATION_TIGHT[loc_txt]
-				else:
-					loc_cor = self._LOCATION[loc_txt]
-				if self.GLOBAL_MPOBJ == None:
-					mpobj = plt.axes(loc_cor)
+				ax = self._LAYER_PLT_OBJECT[lp.twin_ref]
+				if lp.twin == 'x':
+					ax = ax.twinx()
 				else:
-					mpobj = self.GLOBAL_MPOBJ
-			# AXES TYPE AND BASE SETTING
-			if k.SETTINGS['axes_type'] in ['log-log','semilog-x','semilog-y']:
-				if k.SETTINGS['axes_type'] == 'log-log':
-					mpobj.set_xscale('log',basex=k.SETTINGS['x_base'])
-					mpobj.set_yscale('log',basey=k.SETTINGS['y_base'])
-				elif k.SETTINGS['axes_type'] == 'semilog-y':
-					mpobj.set_yscale('log',basey=k.SETTINGS['y_base'])
+					ax = ax.twiny()
+			elif mpobj is not None:
+				ax = mpobj
+			elif not self._PYPLOT:
+				if lp.location is None:
+					ax = fig.add_subplot()
 				else:
-					mpobj.set_xscale('log',basex=k.SETTINGS['x_base'])
+					ax = fig.add_axes(list(lp.location))
+			elif lp.location is None:
+				ax = plt.axes()
 			else:
-				mpobj.set_xscale('linear')
-				mpobj.set_yscale('linear')
-				## Format Helper
-				## 5/17/2017 - kamil - after struggling with the axis formatting, this seemed to fix things, it's not robust nor has it been tested
-				frmtr = ScalarFormatter(useOffset=False)
-				mpobj.get_yaxis().set_major_formatter(frmtr)
-				mpobj.get_xaxis().set_major_formatter(frmtr)
-			# TITLE
-			if k.SETTINGS['title'] is not None:
-				mpobj.set_title(k.SETTINGS['title'],**k.SETTINGS['title_prop'])
-			# GRID
-			if k.SETTINGS['grid_bool']:
-				mpobj.grid(**k.SETTINGS['grid_prop'])
-			# ADD PLOTDATA
-			if len(k.DATA_LIST) != 0:
-				for i,pd in enumerate(k.DATA_LIST):
-					# update plt settings
-					if k.SETTINGS['plot_type'] == 'line':
-						npd 			= update_default_kwargs(self._LINE_DEFAULTS,pd)
-						k.DATA_LIST[i] 	= npd
-					elif k.SETTINGS['plot_type'] == 'bar':
-						npd 			= update_default_kwargs(self._BAR_DEFAULTS,pd)
-						npd['x']		= pd['x']
-						npd['height']	= pd['y']
-						k.DATA_LIST[i] 	= npd
-					elif k.SETTINGS['plot_type'] == 'hist':
-						npd 			= update_default_kwargs(self._HIST_DEFAULTS,pd)
-						npd['x']		= pd['y']
-						if 'min' in npd.keys() or 'max' in npd.keys():
-							npd['range'] = [None,None]
-							if 'min' in npd.keys():
-								npd['range'][0] = npd.pop('min')
-							if 'max' in npd.keys():
-								npd['range'][1] = npd.pop('max')
-						k.DATA_LIST[i]	= npd
-					elif k.SETTINGS['plot_type'] in ['boxplot', 'boxscatter']:
-						npd 			= update_default_kwargs(self._BOXPLOT_DEFAULTS,pd)
-						npd['boxscatter'] = update_default_kwargs(self._BOXSCATTER_DEFAULTS,{})
-						npd['x']		= pd['y']
-						k.DATA_LIST[i]	= npd
-				if k.SETTINGS['plot_type'] in ['line','bar']:
-					# generate color,marker,fill list for the plot
-					inc_cnt = 0
-					for pd in k.DATA_LIST:
-						if pd['increment']:
-							inc_cnt += 1
-					cnt = 0
-					for pd in k.DATA_LIST:
-						# line plots
-						if k.SETTINGS['plot_type'] == 'line':
-							if k.SETTINGS['uniq_cols']:
-								cols = unique_colors(inc_cnt+1,k.SETTINGS['color_map'])
-								col , mar , fill = cols[cnt] , None , None
-							else:
-								cind , mind , find = color_marker_fill_index(cnt,self._COLOR_LIST,self._MARKER_LIST,self._MARKER_FILL_LIST)
-								col , mar , fill = self._COLOR_LIST[cind] , self._MARKER_LIST[mind] , self._MARKER_FILL_LIST[find]
-							if pd['increment']:
-								cnt += 1
-							if 'color' not in pd:
-								pd['color'] = col
-							if 'marker' not in pd:
-								pd['marker'] = mar
-							if 'mfc' not in pd:
-								pd['mfc'] = fill
-							# spline portion
-							sp_key 		= ['color','lw','ls']
-							if pd['spline']:
-								x_spline 	= linspace(pd['x'][0],pd['x'][-1],pd['sp_points'])
-								y_spline 	= UnivariateSpline(pd['x'],pd['y'],k=pd['sp_order'],s=pd['sp_smooth'])(x_spline)
-								sp_dict 	= {}
-								for sp in sp_key:
-									if sp in pd:
-										sp_dict[sp] = pd[sp]
-								pd['lw'] = 0
-								pd['ls'] = ''
-								mpobj.errorbar(x=x_spline,y=y_spline,**sp_dict)
-							pd.pop('spline')
-							pd.pop('sp_smooth')
-							pd.pop('sp_order')
-							pd.pop('sp_points')
-							pd.pop('increment')
-							mpobj.errorbar(**pd)
-						# bar plots
-						elif k.SETTINGS['plot_type'] in ['bar']:
-							if k.SETTINGS['uniq_cols']:
-								cols = unique_colors(inc_cnt+1,k.SETTINGS['color_map'])
-								col , hat , fill = cols[cnt] , None , None
-							else:
-								cind , hind , find 	= color_marker_fill_index(cnt,self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST)
-								col , hat , fill 	= self._COLOR_LIST[cind] , self._HATCH_LIST[hind] , self._HATCH_FILL_LIST[find]
-							if pd['increment']:
-								cnt += 1
-							# do not overwrite user specified values
-							if 'color' not in pd:
-								pd['color'] = col
-							if 'hatch' not in pd:
-								pd['hatch'] = hat
-							if 'fill' not in pd:
-								pd['fill'] = fill
-							pd.pop('increment')
-							mpobj.bar(**pd)
-				elif k.SETTINGS['plot_type'] in ['hist','boxplot', 'boxscatter']:
-					# generate color,marker,fill list for the plot
-					inc_cnt = 0
-					for pd in k.DATA_LIST:
-						if pd['increment']:
-							inc_cnt += 1
-					cnt = 0
-					if k.SETTINGS['plot_type'] == 'hist':
-						x_list		= []
-						labels 		= []
-						colors		= []
-						histargs	= {}
-						for i,pd in enumerate(k.DATA_LIST):
-							if k.SETTINGS['uniq_cols']:
-								cols = unique_colors(inc_cnt+1,k.SETTINGS['color_map'])
-								col = cols[cnt]
-							else:
-								cind , hind , find 	= color_marker_fill_index(cnt,self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST)
-								col = self._COLOR_LIST[cind]
-							if pd['increment']:
-								cnt += 1
-							pd.pop('increment')
-							# do not overwrite user specified values
-							if 'color' not in pd:
-								colors.append(col)
-							else:
-								colors.append(pd['color'])
-								pd.pop('color')
-							# data addition
-							x_list.append(pd['x'])
-							pd.pop('x')
-							# data labels
-							if 'label' in pd:
-								if pd['label'] not in self.SKIP_LABELS:
-									labels.append(pd['label'])
-								else:
-									labels.append('')
-								pd.pop('label')
-							else:
-								labels.append('')
-							# build large plot args
-							for key,val in pd.items():
-								histargs[key] = val
-						mpobj.hist(x=x_list,label=labels,color=colors,**histargs)
-					elif k.SETTINGS['plot_type'] in ['boxplot', 'boxscatter']:
-						x_list 		= []
-						labels 		= []
-						positions	= []
-						bpargs 		= {}
-						bsargs 		= {}
-						bx_fill_col = []
-						for i,pd in enumerate(k.DATA_LIST):
-							# add data to plot
-							x_list.append(pd['x'])
-							# pop off the values that are not required anymore.
-							pd.pop('x')
-							pd.pop('increment')
-							# update colors
-							bx_fill_col.append(pd.get('box_fill_color','Auto'))
-							pd.pop('box_fill_color',None)
-							# add labels to the data sets
-							if 'label' in pd:
-								if pd['label'] not in self.SKIP_LABELS:
-									labels.append(pd['label'])
-								else:
-									labels.append(None)
-								pd.pop('label')
-							else:
-								labels.append(None)
-							# customize the positions
-							if 'loc' in pd:
-								positions.append(pd['loc'])
-								pd.pop('loc')
-							else:
-								positions.append(i+1)
-							# update bpargs with user passed variabls and preform rename if required
-							bsargs = pd['boxscatter']
-							pd.pop('boxscatter')
-							for key,val in pd.items():
-								if key in ['width','showmean','showcap']:
-									key = key+'s'
-								bpargs[key] = val
-
-						# make the box plot complete with box filling
-						res_dict = mpobj.boxplot(x=x_list,labels=labels,positions=positions,**bpargs)
-						for ind,box in enumerate(res_dict['boxes']):
-							# update box fill color
-							color = bx_fill_col[ind]
-							if color != 'Auto':
-								box.set_facecolor(color)
-								box.set_zorder(0)
-							else:
-								box.set_facecolor('None')
-
-						# add the scatter option overtop
-						if k.SETTINGS['plot_type'] == 'boxscatter':
-							def helper_boxplot(vals):
-								# removes the outliers
-								quart3,quart1 = np.percentile(vals,[75.0,25.0])
-								iqr = quart3 - quart1
-								up_lim = (1.5*iqr) + quart3
-								dn_lim = quart1 - (1.5*iqr)
-								ret_list = []
-								for v in vals:
-									if v <= up_lim and v >= dn_lim:
-										ret_list.append(v)
-								# check for single value
-								if len(ret_list) == 1:
-									ret_list = []
-								return ret_list
-
-							pos_array = []
-							val_array = []
-							for ind,pos in enumerate(positions):
-								vals = helper_boxplot(x_list[ind])
-								pos_array_ent = [pos]*len(vals)
-								pos_array = pos_array + pos_array_ent
-								val_array = val_array + vals
-							# make it jitter
-							rands = np.random.random_integers(-4,4,len(val_array))
-							rands = rands/100.0
-							# update pos array
-							new_pos = []
-							for i,ent in enumerate(pos_array):
-								new_pos.append(ent+rands[i])
-							if bpargs.get('vert',True) == False:
-								# horizontal boxplot, swap
-								x_, y_ = val_array, new_pos
-							else:
-								x_, y_ = new_pos, val_array
-							mpobj.scatter(x_, y_,**bsargs)
-
-			# AXES LABELS, TICKS, FORMATTING, and PARAMETERS
-			if k.SETTINGS['xlabel'] is not None:
-				mpobj.set_xlabel(k.SETTINGS['xlabel'],**k.SETTINGS['xlab_prop'])
-			if k.SETTINGS['ylabel'] is not None:
-				mpobj.set_ylabel(k.SETTINGS['ylabel'],**k.SETTINGS['ylab_prop'])
-			if k.SETTINGS['xticks'] is not None:
-				mpobj.set_xticks(k.SETTINGS['xticks'])
-				mpobj.set_xticklabels(k.SETTINGS['xtick_labels'],**k.SETTINGS['xtick_prop'])
-			elif k.SETTINGS['xtick_prop'] is not None:
-				# change settings even if no ticks are specified
-				mpobj.set_xticklabels(mpobj.get_xticklabels(),**k.SETTINGS['xtick_prop'])
-			if k.SETTINGS['yticks'] is not None:
-				mpobj.set_yticks(k.SETTINGS['yticks'])
-				mpobj.set_yticklabels(k.SETTINGS['ytick_labels'],**k.SETTINGS['ytick_prop'])
-			elif k.SETTINGS['ytick_prop'] is not None:
-				# change settings even if no ticks are specified
-				mpobj.set_yticklabels(mpobj.get_yticklabels(),**k.SETTINGS['ytick_prop'])
-#			if k.XTICK_FORMAT is not None:
-#				mpobj.xaxis.set_major_formatter(matplotlib.ticker.ScalarFormatter())
-#				mpobj.ticklabel_format(axis='x',**k.XTICK_FORMAT)
-#			if k.YTICK_FORMAT is not None:
-#				mpobj.yaxis.set_major_formatter(matplotlib.ticker.ScalarFormatter())
-#				mpobj.ticklabel_format(axis='y',**k.YTICK_FORMAT)
-			if k.XTICK_PARAM is not None:
-				if 'maxticks' in k.XTICK_PARAM.keys():
-					mpobj.locator_params(axis='x',nbins=k.XTICK_PARAM['maxticks'])
-					k.XTICK_PARAM.pop('maxticks')
-				mpobj.tick_params(axis='x',**k.XTICK_PARAM)
-			if k.YTICK_PARAM is not None:
-				if 'maxticks' in k.YTICK_PARAM.keys():
-					mpobj.locator_params(axis='y',nbins=k.YTICK_PARAM['maxticks'])
-					k.YTICK_PARAM.pop('maxticks')
-				mpobj.tick_params(axis='y',**k.YTICK_PARAM)
-			# AXES LIMITS
-			if k.SETTINGS['x_limit'] is not None:
-				xmin , xmax = k.SETTINGS['x_limit']
-				if xmin is not None:
-					mpobj.set_xlim(left=xmin)
-				if xmax is not None:
-					mpobj.set_xlim(right=xmax)
-			if k.SETTINGS['y_limit'] is not None:
-				ymin , ymax = k.SETTINGS['y_limit']
-				if ymin is not None:
-					mpobj.set_ylim(bottom=ymin)
-				if ymax is not None:
-					mpobj.set_ylim(top=ymax)
-			# FRAME ELEMENTS
-			if not k.FRAMES['top']:
-				mpobj.spines['top'].set_color('None')
-			if not k.FRAMES['bottom']:
-				mpobj.spines['bottom'].set_color('None')
-			if not k.FRAMES['right']:
-				mpobj.spines['right'].set_color('None')
-			if not k.FRAMES['left']:
-				mpobj.spines['left'].set_color('None')
-			# ADD AXHLINE
-			if len(k.AXHLINE_LIST) != 0:
-				for ax in k.AXHLINE_LIST:
-					# convert xmin and xmax values to x,y values
-					if 'xmin' in ax.keys():
-						xmin , err = convert_xy(mpobj,ax['xmin'],0)
-						ax['xmin'] = xmin
-					if 'xmax' in ax.keys():
-						xmax , err = convert_xy(mpobj,ax['xmax'],0)
-						ax['xmax'] = xmax
-					mpobj.axhline(**ax)
-			# ADD AXVLINE
-			if len(k.AXVLINE_LIST) != 0:
-				for ax in k.AXVLINE_LIST:
-					# convert ymin and xmax values to x,y values
-					if 'ymin' in ax.keys():
-						err , ymin = convert_xy(mpobj,0,ax['ymin'])
-						ax['ymin'] = ymin
-					if 'ymax' in ax.keys():
-						err, ymax  = convert_xy(mpobj,0,ax['ymax'])
-						ax['ymax'] = ymax
-					mpobj.axvline(**ax)
-			# ADD TEXT
-			if len(k.TEXT_LIST) != 0:
-				for txt in k.TEXT_LIST:
-					txt['s'] = txt.pop('txt')
-					mpobj.text(**txt)
-			# ADD RECTANGLE
-			if len(k.RECT_LIST) != 0:
-				inc_cnt = 0
-				for rd in k.RECT_LIST:
-					if rd['increment']:
-						inc_cnt += 1
-				# plotting portion
-				cnt = 0
-				for rd in k.RECT_LIST:
-					if k.SETTINGS['uniq_cols']:
-						cols = unique_colors(inc_cnt+1,k.SETTINGS['color_map'])
-						color , h , fill = cols[cnt] , None , None
-					else:
-						cind , hind , find 	= color_marker_fill_index(cnt,self._COLOR_LIST,self._HATCH_LIST,self._HATCH_FILL_LIST)
-						color , h , fill 	= self._COLOR_LIST[cind] , self._HATCH_LIST[hind] , self._HATCH_FILL_LIST[find]
-					if rd['increment']:
-						cnt += 1
-					# do not overwrite user specified values
-					if 'color' not in rd:
-						rd['color'] = color
-					if 'hatch' not in rd:
-						rd['hatch']	= h
-					if 'fill' not in rd:
-						rd['fill']	= fill
-					# y-coords are in data , x-coords are in axes units
-					rd['xmin']=convert_xy(mpobj,rd['xmin'],0)[0]
-					rd['xmax']=convert_xy(mpobj,rd['xmax'],0)[0]
-					rd.pop('increment')
-					mpobj.axhspan(**rd)
-			# ADD ARROW
-			if len(k.ARROW_LIST) != 0:
-				print('adding arrows')
-				for ad in k.ARROW_LIST:
-					mpobj.arrow(**ad)
-			# ADD LEGEND
-			# -- needs to go last, otherwise possible 'no label situation'
-			if k.SETTINGS['leg_props'] is not None:
-				if k.SETTINGS['leg_props']['bool']:
-					k.SETTINGS['leg_props'].pop('bool')
-					l = mpobj.legend(prop=k.SETTINGS['leg_fprop'],**k.SETTINGS['leg_props'])
-					# update the legend title also
-					if k.SETTINGS['leg_props']['title'] is not None:
-						plt.setp(l.get_title(),**k.SETTINGS['leg_fprop'])
-
+				ax = plt.axes(list(lp.location))
+			results = run_calls(ax,lp.calls)
+			# keep the lines of every data set , update_plotdata() changes them in place
+			live = {}
+			for index,sp_call,line_call in lp.series:
+				line = results[line_call]
+				if not isinstance(line,Line2D):
+					# errorbar container , its first line holds the data
+					line = line.lines[0]
+				live[index] = (results[sp_call] if sp_call is not None else None , line)
+			self._LIVE.append(live)
 			# make copy of the entire object
-			self._LAYER_PLT_OBJECT.append(mpobj)
-
-		return mpobj
+			self._LAYER_PLT_OBJECT.append(ax)
+		return ax
 
-	def saveMe(self,fname,**kwargs):
+	def saveMe(self,fname,cache=None,**kwargs):
 		"""
-		saves the figure to file `fname`
+		saves the figure to file `fname` , or to several files at once
 
 		** args **
-		fname 	- path/filename to save to
+		fname 	- path/filename to save to , a binary file object , or None to return the
+				  file contents as bytes. with format 'rgba' and `fname` None the Agg canvas
+				  buffer is returned as a (height , width , 4) uint8 array , without a copy.
+				  the array is only valid until the figure is drawn again.
+				  a list of outputs saves them all and returns a list of the results. an
+				  output is one of the above , or a (fname , dictionary) tuple whose dictionary
+				  overrides the kwargs below for that output , e.g.
+				  	['fig.png',('fig_print.png',{'dpi':300}),'fig.pdf','fig.svg']
+				  the figure is laid out once , and every file is saved from the laid out
+				  figure (files of another size or dpi are laid out again)
+		cache 	- kaplot.cache.rendercache or cache directory , a file is copied from the
+				  cache when the figure was rendered before with the same spec, data and
+				  savefig settings. otherwise the figure is drawn (makePlot() is called
+				  if it was not yet) and saved , and the file is added to the cache
 
 		** kwargs **
 		height 	- dimension of figure, in inches
 		width 	- dimension of figure, in inches
 		dpi 	- the dots per inch of the figure
+		format 	- file format , defaults to the extension of the file name
+		backend - matplotlib backend writing the file , defaults to the vector backend of
+				  .pdf/.svg/.eps/.ps files (see kaplot_backend.set_output_backend)
+
+		returns the bytes or array of outputs given as None , None for files
 		"""
 		#if self._SAVED is None:
 		#	self._SAVED = pickle.dumps(self,pickle.HIGHEST_PROTOCOL)
-		sf = update_default_kwargs(self.SAVEFIG_SETTINGS,kwargs)
-		fig = plt.gcf()
-		if 'width' in sf and 'height' in sf:
-			fig.set_size_inches(sf['width'],sf['height'])
-			sf.pop('width')
-			sf.pop('height')
-		if self.PLOT_SETTINGS['tight_layout']:
-			plt.tight_layout(pad=0.75)
-		plt.savefig(fname,**sf)
-		return
+		outputs = []
+		for out in (fname if isinstance(fname,list) else [fname]):
+			okw = kwargs
+			if isinstance(out,tuple):
+				out , okw = out[0] , dict(kwargs,**out[1])
+			outputs.append((out,update_default_kwargs(self.SAVEFIG_SETTINGS,okw)))
+		# figures drawn into a user axes object hold more than this spec , never cached
+		if cache is None or self.GLOBAL_MPOBJ is not None:
+			results = self._save(outputs)
+		else:
+			results = self._save_cached(outputs,cache)
+		return results if isinstance(fname,list) else results[0]
+
+	def _save_cached(self,outputs,cache):
+		"""
+		saves `outputs` through the render cache `cache` , only the outputs missing from the
+		cache are drawn. returns the results of the outputs as _save()
+		"""
+		from .cache import render_cache, fingerprint, matplotlib_version
+		cache 	= render_cache(cache)
+		# the spec and data are hashed once for all outputs
+		spec 	= fingerprint(self._archive_state(),_RC_SETTINGS,__version__,matplotlib_version())
+		results = [None] * len(outputs)
+		missing = []
+		for i,(out,sf) in enumerate(outputs):
+			fmt = sf.get('format')
+			if fmt is None and isinstance(out,(str,os.PathLike)):
+				fmt = os.path.splitext(os.fspath(out))[1][1:]
+			fmt = (fmt or '').lower()
+			key = fingerprint(spec,sf,fmt,output_backend(out,sf.get('format')))
+			ext = '.' + fmt if fmt else ''
+			# canvas buffers are views of the drawn figure , never cached
+			if out is None and fmt in _RAW_FORMATS:
+				missing.append((i,None,ext))
+				continue
+			target = BytesIO() if out is None else out
+			if cache.fetch(key,target,ext):
+				if out is None:
+					results[i] = target.getvalue()
+				continue
+			missing.append((i,key,ext))
+		if not missing:
+			return results
+		# the outputs are stored under the fingerprint of the current spec , the figure is
+		# drawn again when it was drawn from an older one
+		if not self._LAYER_PLT_OBJECT or self._DRAWN is not self.compilePlot():
+			self.makePlot()
+		drawn = self._save([outputs[i] for i,key,ext in missing])
+		for (i,key,ext),result in zip(missing,drawn):
+			results[i] = result
+			if key is None:
+				continue
+			if outputs[i][0] is None:
+				cache.store(key,result,ext)
+			elif not hasattr(outputs[i][0],'write'):
+				cache.store(key,outputs[i][0],ext)
+		return results
+
+	def _save(self,outputs):
+		"""
+		saves the drawn figure to every (fname , savefig settings) of `outputs`. returns a
+		list with the bytes (or canvas buffer) of the outputs given as None , None for files
+		"""
+		_load()
+		if not self._PYPLOT:
+			# the object owns its figure , it is drawn when saveMe() comes first
+			if self.FIGURE is None:
+				self.makePlot()
+			with figure_rc(self.compilePlot()):
+				return self._save_figure(self.FIGURE,outputs)
+		_load(pyplot=True)
+		return self._save_figure(plt.gcf(),outputs)
+
+	def _save_figure(self,fig,outputs):
+		"""
+		sizes, lays out and saves `fig` to every (fname , savefig settings) of `outputs`. the
+		layout of the first file is kept for the following files of the same size and dpi ,
+		as the layout depends on both
+		"""
+		size , engine = None , None
+		results = []
+		try:
+			for fname,sf in outputs:
+				sf = dict(sf)
+				if 'width' in sf and 'height' in sf:
+					fig.set_size_inches(sf.pop('width'),sf.pop('height'))
+				key = None
+				if size != (tuple(fig.get_size_inches()),sf.get('dpi')):
+					if engine is not None:
+						restore_layout(fig,engine)
+					size 		= (tuple(fig.get_size_inches()),sf.get('dpi'))
+					key , engine = self._layout_figure(fig,sf.get('dpi'))
+				# vector formats are written by their own backend , skipping the raster canvas
+				if 'backend' not in sf and output_backend(fname,sf.get('format')) is not None:
+					sf['backend'] = output_backend(fname,sf.get('format'))
+				if fname is None and sf.get('format','').lower() in _RAW_FORMATS:
+					results.append(canvas_buffer(fig,sf))
+				elif fname is None:
+					buf = BytesIO()
+					fig.savefig(buf,**sf)
+					results.append(buf.getvalue())
+				else:
+					fig.savefig(fname,**sf)
+					results.append(None)
+				if key is not None:
+					store_layout(key,fig)
+				if len(outputs) > 1 and auto_layout(fig):
+					# the layout engine ran in this draw , the next files reuse its result
+					engine = apply_layout(fig,layout_pars(fig))
+		finally:
+			if engine is not None:
+				# the figure may be drawn again , e.g. the current pyplot figure
+				restore_layout(fig,engine)
+		return results
+
+	def _layout_figure(self,fig,dpi):
+		"""
+		lays out `fig` before it is saved at `dpi`. a cached layout replaces the measuring pass
+		of tight_layout / figure.autolayout. returns the layout key to store once the figure
+		is drawn (or None) , and the layout engine turned off by a cached layout (or None)
+		"""
+		key , engine = None , None
+		tight 	= self.PLOT_SETTINGS['tight_layout']
+		if self.PLOT_SETTINGS['layout_cache'] and (tight or auto_layout(fig)):
+			key 	= layout_key(self,fig,0.75 if tight else None,dpi)
+			pars 	= get_layout(key)
+			if pars is not None:
+				engine 	= apply_layout(fig,pars)
+				tight , key = False , None
+		if tight:
+			fig.tight_layout(pad=0.75)
+		return key , engine
 
 	def saveObj(self,fname):
 		"""
-		saves the plot objects to a file `fname` to edit later
+		saves the plot objects to a file `fname` to edit later , see loadObj(). the layers and
+		settings are stored as a JSON document and the data arrays as raw blocks which are
+		memory-mapped when the file is loaded (kaplot.archive)
 
 		** args **
 		fname 	- path/filename to save to
 		"""
-		f = open(fname,'wb')
+		from .archive import save_archive
 		if self._SAVED is None:
-			pickle.dump(self,f,pickle.HIGHEST_PROTOCOL)
-		else:
-			f.write(self._SAVED)
+			save_archive(fname,self._archive_state())
+			return
+		f = open(fname,'wb')
+		f.write(self._SAVED)
 		f.close()
 		return
 
-	def showMe(self, saveBool=False):
+	def _archive_state(self):
+		"""
+		returns the plot spec as plain data , the rendered matplotlib objects are left out.
+		the data is stored as arrays first , as compilePlot() stores it
+		"""
+		for k in self._LAYER_OBJECTS:
+			k.store_columns()
+		return {	'version'	:	__version__ , \
+					'pyplot'	:	self._PYPLOT , \
+					'settings'	:	dict((group,getattr(self,group)) for group in self._STORE.groups()) , \
+					'layers'	:	[{	'name'		:	name , \
+										'settings'	:	settings , \
+										'axes'		:	dict(k.__dict__)} \
+									for name,settings,k in zip(self._LAYER_NAMES,self._LAYER_SETTINGS,self._LAYER_OBJECTS)]}
+
+	def showMe(self, saveBool=False, block=None):
 		"""
 		shows the figure which has been generated
 		note : this depends on the backend selected
+
+		** args **
+		saveBool 	- True/False , keep a copy of the object to be written by saveObj()
+		block 		- False returns right away , for live figures refreshed with
+					  update_plotdata()
 		"""
+		if not self._PYPLOT:
+			print('kaplot: showMe error. only available in pyplot mode.')
+			return
 		if saveBool:
-			self._SAVED = pickle.dumps(self,pickle.HIGHEST_PROTOCOL)
-		plt.show()
+			from .archive import write_archive
+			buf = BytesIO()
+			write_archive(buf,self._archive_state())
+			self._SAVED = buf.getvalue()
+		_load(pyplot=True)
+		if block is None:
+			plt.show()
+		else:
+			plt.show(block=block)
 		return
 
 class kaxes(object):
@@ -1432,7 +1918,13 @@ class kaxes(object):
 								'x_limit'		:	None			, \
 								'y_limit'		:	None			, \
 								'leg_props'		:	None			, \
-								'leg_fprop'		:	None}
+								'leg_fprop'		:	None			, \
+								'decimate'		:	None			, \
+								'collection'	:	False			, \
+								'coll_label'	:	None			, \
+								'bs_seed'		:	0				, \
+								'bs_max_points'	:	None			, \
+								'float32'		:	False}
 
 		self.FRAMES 	= 	{	'top'			:	True 			, \
 								'bottom'		:	True 			, \
@@ -1533,6 +2025,27 @@ class kaxes(object):
 		self.YTICK_PARAM = params
 		return
 
+	def set_decimate(self,method):
+		self.SETTINGS['decimate'] = method
+		return
+
+	def set_boxscatter(self,seed,max_points):
+		self.SETTINGS['bs_seed'] 		= seed
+		self.SETTINGS['bs_max_points']	= max_points
+		return
+
+	def set_line_collection(self,cbool,label):
+		self.SETTINGS['collection'] = cbool
+		self.SETTINGS['coll_label'] = label
+		return
+
+	def set_float32(self,fbool):
+		self.SETTINGS['float32'] = fbool
+		# convert the stored data again with the new type
+		for pd in self.DATA_LIST:
+			pd.pop('_finite',None)
+		return
+
 	def set_unique_colors(self,ubool,cmap):
 		self.SETTINGS['uniq_cols'] 	= ubool
 		self.SETTINGS['color_map']	= cmap
@@ -1559,9 +2072,41 @@ class kaxes(object):
 		return
 
 	def add_plotdata(self,**pdict):
+		# stored as passed , store_columns() converts the data when the layer is compiled
 		self.DATA_LIST.append(pdict)
 		return
 
+	def update_plotdata(self,index,**pdict):
+		data 	= dict(self.DATA_LIST[index])
+		stored 	= '_finite' in data
+		data.pop('_finite',None)
+		data.update(pdict)
+		self.DATA_LIST[index] = self._columns(data) if stored else data
+		return self.DATA_LIST[index]
+
+	def store_columns(self):
+		"""
+		stores the data columns of every data set not converted yet as arrays (see _columns).
+		called when the layer is compiled , so building a spec does not import numpy , and
+		the stored data does not depend on what was imported before
+		"""
+		for i,pd in enumerate(self.DATA_LIST):
+			if '_finite' not in pd:
+				self.DATA_LIST[i] = self._columns(dict(pd))
+		return
+
+	def _columns(self,pdict):
+		# store the data columns as arrays , arrays passed in are kept without a copy. the
+		# mask of the finite points is stored as `_finite` , None when all points are finite ,
+		# its presence marks the converted data sets
+		_load_numpy()
+		dtype = np.float32 if self.SETTINGS['float32'] else None
+		for key,ndim in _DATA_COLUMNS.items():
+			if pdict.get(key) is not None:
+				pdict[key] = data_column(pdict[key],dtype,ndim)
+		pdict['_finite'] = finite_mask(pdict.get('x'),pdict.get('y'))
+		return pdict
+
 	def set_legend(self,fdict,**kwargs):
 		self.SETTINGS['leg_fprop'] = fdict
 		self.SETTINGS['leg_props'] = kwargs
@@ -1575,6 +2120,57 @@ class kaxes(object):
 		self.ARROW_LIST.append(kwargs)
 		return
 
+def loadObj(fname,pyplot=None):
+	"""
+	loads a kaplot object saved with saveObj() , the data arrays are memory-mapped (read
+	only) and read from disk when the plot is drawn. files written by older versions , which
+	pickled the object , are read as well : a new object is built from their settings and
+	layers.
+
+	** args **
+	fname 	- path/filename to load
+	pyplot 	- True/False , overrides the pyplot mode the object was saved with
+	"""
+	from .archive import is_archive, load_archive
+	if is_archive(fname):
+		state = load_archive(fname)
+	else:
+		import pickle
+		with open(fname,'rb') as f:
+			state = legacy_state(pickle.load(f))
+	kobj 	= kaplot([state['settings']],pyplot=state['pyplot'] if pyplot is None else pyplot)
+	kobj._LAYER_NAMES 		= []
+	kobj._LAYER_SETTINGS 	= []
+	kobj._LAYER_OBJECTS 	= []
+	for layer in state['layers']:
+		k 			= kaxes()
+		# settings added since the object was saved keep their defaults
+		settings 	= dict(k.SETTINGS)
+		settings.update(layer['axes'].get('SETTINGS',{}))
+		k.__dict__.update(layer['axes'])
+		k.SETTINGS 	= settings
+		settings 	= dict(kaplot.LAYER_SETTINGS)
+		settings.update(layer['settings'])
+		kobj._LAYER_NAMES.append(layer['name'])
+		kobj._LAYER_SETTINGS.append(settings)
+		kobj._LAYER_OBJECTS.append(k)
+	return kobj
+
+def legacy_state(kobj):
+	"""
+	returns the plot spec of a kaplot object pickled by an older version , in the form
+	saveObj() archives it. the object itself lacks the attributes added since
+	"""
+	if not isinstance(kobj,kaplot):
+		raise ValueError('kaplot: loadObj error. the file does not hold a kaplot object.')
+	attrs = kobj.__dict__
+	return {	'pyplot'	:	attrs.get('_PYPLOT',True) , \
+				'settings'	:	dict((group,attrs[group]) for group in kd.default if group in attrs) , \
+				'layers'	:	[{	'name'		:	name , \
+									'settings'	:	settings , \
+									'axes'		:	dict(k.__dict__)} \
+								for name,settings,k in zip(attrs['_LAYER_NAMES'],attrs['_LAYER_SETTINGS'],attrs['_LAYER_OBJECTS'])]}
+
 ## HELPER FUNCTIONS
 def update_default_kwargs(default_dict,current_dict):
 	"""
@@ -1596,6 +2192,101 @@ def update_default_kwargs(default_dict,current_dict):
 				return_dict[key] = kval
 	return return_dict
 
+# data columns and the largest dimension of the lists converted to arrays ; a list of data
+# sets for a hist layer must stay a list
+_DATA_COLUMNS = {'x' : 1 , 'y' : 1 , 'xerr' : 2 , 'yerr' : 2}
+
+def data_column(val,dtype=None,ndim=1):
+	"""
+	returns the data column `val` as an array. arrays are returned without a copy unless
+	`dtype` asks for a conversion , lists of numbers become contiguous float arrays. scalars
+	and non numeric data (strings , dates , accumulators) are returned as passed.
+
+	** args **
+	val 	- data column
+	dtype 	- None , or the float type to store numeric data with
+	ndim 	- lists with more dimensions are returned as passed
+	"""
+	if isinstance(val,np.ndarray):
+		if dtype is None or val.dtype.kind not in 'iuf':
+			return val
+		return np.ascontiguousarray(val,dtype=dtype)
+	if np.isscalar(val) or not isinstance(val,(list,tuple)):
+		return val
+	try:
+		arr = np.asarray(val)
+	except ValueError:
+		# ragged data
+		return val
+	if arr.dtype.kind not in 'iuf' or arr.ndim > ndim:
+		return val
+	return np.ascontiguousarray(arr,dtype=dtype or float)
+
+def finite_mask(x,y):
+	"""
+	returns the mask of the points where both `x` and `y` are finite , or None when all of
+	them are. only float arrays are checked , `x` is ignored when its shape differs from `y`.
+	"""
+	cols = [c for c in [y,x] if isinstance(c,np.ndarray) and c.dtype.kind == 'f' and c.ndim == 1]
+	if not cols:
+		return None
+	finite = np.isfinite(cols[0])
+	for c in cols[1:]:
+		if c.shape == finite.shape:
+			finite &= np.isfinite(c)
+	return None if finite.all() else finite
+
+def finite_data(x,finite):
+	"""
+	returns the finite values of a raw hist/box data set
+	"""
+	if finite is None or not isinstance(x,np.ndarray) or x.shape != finite.shape:
+		return x
+	return x[finite]
+
+def prebinned_hist(x_list,counts,edges,hrange=None):
+	"""
+	converts the data sets of a hist layer with pre-binned data to the
+	weights form of Axes.hist , so the drawing cost depends on the number
+	of bins and not on the number of samples. every bin is represented by
+	its left edge weighted by the bin count, raw data sets are binned with
+	the shared edges.
+
+	** args **
+	x_list 	- list of raw data arrays , unused for pre-binned data sets
+	counts 	- list of count arrays , None for raw data sets
+	edges 	- list of edge arrays , None for raw data sets
+	hrange 	- (min,max) range applied to the raw data sets
+
+	returns x_list , weights , bins
+	"""
+	bins = None
+	for c,e in zip(counts,edges):
+		if c is None:
+			continue
+		if e is None:
+			raise ValueError('kaplot: pre-binned hist data requires both counts and edges')
+		e = np.asarray(e,dtype=float)
+		if e.ndim != 1 or len(e) != len(c) + 1:
+			raise ValueError('kaplot: hist edges must have len(counts) + 1 values')
+		if bins is None:
+			bins = e
+		elif len(bins) != len(e) or not np.allclose(bins,e):
+			raise ValueError('kaplot: pre-binned hist data sets of a layer must share the same edges')
+	lefts 		= bins[:-1]
+	new_x 		= []
+	weights 	= []
+	for x,c in zip(x_list,counts):
+		if c is None:
+			if hrange is not None:
+				x = np.asarray(x)
+				lo , hi = hrange
+				x = x[(x >= (bins[0] if lo is None else lo)) & (x <= (bins[-1] if hi is None else hi))]
+			c = np.histogram(x,bins=bins)[0]
+		new_x.append(lefts)
+		weights.append(np.asarray(c,dtype=float))
+	return new_x , weights , bins
+
 def srange(start,end,incr,log=False):
 	"""
 	returns a number range, from `start` to `end` with an
@@ -1670,9 +2361,462 @@ def unique_colors(ncols,color_map='gist_rainbow'):
 
 	returns a list of color tuples
 	"""
-	retList = []
-	cm = plt.get_cmap(color_map)
-	for i in range(ncols):
-		color = cm(1.0*i/ncols)
-		retList.append(color)
-	return retList
+	return list(colormap_colors(color_map,ncols))
+
+@lru_cache(maxsize=64)
+def colormap_colors(color_map,ncols):
+	"""
+	returns a tuple of `ncols` color tuples evenly sampled from the colormap `color_map`,
+	looked up in one call and cached per (color_map , ncols)
+	"""
+	rgba = get_cmap(color_map)(np.arange(ncols)/float(ncols))
+	return tuple(tuple(c) for c in rgba.tolist())
+
+def style_table(increments,clist,mlist,flist,uniq_cols=False,color_map='gist_rainbow'):
+	"""
+	resolves the automatic styles of all items of a layer at once. an item takes the
+	style of the running count of `increment` items before it , the same sequence as
+	color_marker_fill_index() applied item by item.
+
+	** args **
+	increments 	- list of the `increment` flags of the items
+	clist 		- color list
+	mlist 		- marker (or hatch) list
+	flist 		- fill list
+	uniq_cols 	- True/False , take the colors from `color_map` instead of `clist`
+	color_map 	- matplotlib colormap name
+
+	returns a list of (color , marker , fill) tuples , marker and fill are None for
+	unique colors
+	"""
+	inc = np.asarray(increments,dtype=bool)
+	if len(inc) == 0:
+		return []
+	cnt = np.cumsum(inc) - inc
+	if uniq_cols:
+		cols = colormap_colors(color_map,int(inc.sum())+1)
+		return [(cols[i],None,None) for i in cnt.tolist()]
+	ncol , nmar = len(clist) , len(mlist)
+	cind = (cnt % ncol).tolist()
+	mind = ((cnt // ncol) % nmar).tolist()
+	find = ((cnt // (ncol*nmar)) % len(flist)).tolist()
+	return [(clist[c],mlist[m],flist[f]) for c,m,f in zip(cind,mind,find)]
+
+def color_marker_fill_index(cnt,clist,mlist,flist):
+	"""
+	helper function which uses the cnt number to determine which
+	color , marker , fill will be used
+
+	** args **
+	cnt 	- integer number
+	clist 	- color list
+	mlist 	- marker (or hatch) list
+	flist 	- fill list
+
+	returns tuple (color_index , marker_index , fill_index)
+	"""
+	cind = cnt%len(clist)
+	mind = (cnt // len(clist)) % len(mlist)
+	find = (cnt // (len(clist)*len(mlist))) % len(flist)
+	return (cind,mind,find)
+
+def get_cmap(color_map):
+	"""
+	returns the matplotlib colormap named `color_map` , without going through pyplot
+	"""
+	try:
+		from matplotlib import colormaps
+	except ImportError:
+		from matplotlib.cm import get_cmap as _get_cmap
+		return _get_cmap(color_map)
+	return colormaps[color_map]
+
+def xkcd_rc(scale=1,length=100,randomness=2):
+	"""
+	returns the rc settings of matplotlib's xkcd sketch mode , see pyplot.xkcd()
+	"""
+	return {	'font.family'		:	['xkcd', 'xkcd Script', 'Comic Neue', 'Comic Sans MS'], \
+				'font.size'			:	14.0 		, \
+				'path.sketch'		:	(scale, length, randomness), \
+				'path.effects'		:	[patheffects.withStroke(linewidth=4, foreground='w')], \
+				'axes.linewidth'	:	1.5 		, \
+				'lines.linewidth'	:	2.0 		, \
+				'figure.facecolor'	:	'white'		, \
+				'grid.linewidth'	:	0.0 		, \
+				'axes.grid'			:	False 		, \
+				'axes.unicode_minus':	False 		, \
+				'axes.edgecolor'	:	'black'		, \
+				'xtick.major.size'	:	8 			, \
+				'xtick.major.width'	:	3 			, \
+				'ytick.major.size'	:	8 			, \
+				'ytick.major.width'	:	3}
+
+@contextmanager
+def figure_rc(plan):
+	"""
+	context manager used by figure mode. applies the kaplot rc settings, the style and
+	xkcd mode of the render plan `plan` on top of the current rcParams and restores them
+	on exit. the settings are process wide in matplotlib and read while the artists are
+	created and drawn, so the context also holds _RC_LOCK for the whole makePlot() /
+	saveMe() : figure mode renders are thread-safe but serialized. work done outside of
+	it (e.g. compilePlot) still runs concurrently.
+	"""
+	with _RC_LOCK:
+		with ExitStack() as stack:
+			stack.enter_context(matplotlib.rc_context(_RC_SETTINGS))
+			if plan.style is not None:
+				stack.enter_context(mplstyle.context(plan.style))
+			if plan.xkcd:
+				stack.enter_context(matplotlib.rc_context(xkcd_rc()))
+			yield
+
+# errorbar() styling of the error lines , ignored when a line is drawn with plot()
+_ERRORBAR_STYLE = ['xerr','yerr','ecolor','elinewidth','capsize']
+# errorbar() only keyword arguments , their presence keeps a line on errorbar()
+_ERRORBAR_ONLY 	= ['capthick','barsabove','lolims','uplims','xlolims','xuplims','errorevery','elinestyle']
+
+def outside_view(ax,artists):
+	"""
+	returns True if the data of the lines `artists` reaches beyond the view limits of the
+	axes `ax` along an axis with automatic limits
+	"""
+	for auto,lim,get in [(ax.get_autoscalex_on(),ax.get_xlim(),'get_xdata'),(ax.get_autoscaley_on(),ax.get_ylim(),'get_ydata')]:
+		if not auto:
+			continue
+		lo , hi = min(lim) , max(lim)
+		for a in artists:
+			vals = np.asarray(getattr(a,get)(),dtype=float)
+			vals = vals[np.isfinite(vals)]
+			if len(vals) and (vals.min() < lo or vals.max() > hi):
+				return True
+	return False
+
+def has_errors(pdict):
+	"""
+	returns True if the plot data dictionary `pdict` has x or y error data
+	"""
+	return pdict.get('xerr') is not None or pdict.get('yerr') is not None
+
+def line_call(pdict,plain=True):
+	"""
+	returns the draw call for the line plot data dictionary `pdict`. data without error
+	bars is drawn as a bare Line2D, which skips the ErrorbarContainer and error line
+	collections of Axes.errorbar as well as the argument parsing of Axes.plot , but
+	draws the same line. `plain` False forces errorbar.
+
+	returns a drawcall
+	"""
+	if not plain or has_errors(pdict) or pdict.get('fmt') or pdict.get('color') is None:
+		return plan_call('errorbar',**pdict)
+	for key in _ERRORBAR_ONLY:
+		if pdict.get(key) is not None:
+			return plan_call('errorbar',**pdict)
+	# errorbar drops None values and lifts the data line above the error bars
+	kw = {}
+	for key,val in pdict.items():
+		if val is not None and key not in _ERRORBAR_STYLE:
+			kw[key] = val
+	x , y 		= kw.pop('x') , kw.pop('y')
+	kw['zorder'] = kw.get('zorder',2) + 0.1
+	return plan_call('_line',x,y,**kw)
+
+# line kwargs which can be expressed by a LineCollection
+_COLLECTION_KEYS 	= ['x','y','xerr','yerr','label','color','lw','ls','alpha','marker','mfc','mec','ms','markevery','ecolor','elinewidth','capsize']
+# line style kwargs shared by all data sets of a collection
+_COLLECTION_STYLE 	= ['lw','ls','alpha']
+
+def collection_key(pdict):
+	"""
+	returns the line style (lw, ls, alpha) tuple used to group the line plot data
+	dictionary `pdict` into a LineCollection , or None if it has to be drawn on its own
+	"""
+	if has_errors(pdict) or pdict.get('marker') not in [None,'None','none','']:
+		return None
+	if pdict.get('ls') in ['','None','none',' '] or pdict.get('color') is None:
+		return None
+	for key in pdict:
+		if key not in _COLLECTION_KEYS:
+			return None
+	return tuple(pdict.get(key) for key in _COLLECTION_STYLE)
+
+def collection_call(pdicts,label=None,skip_labels=()):
+	"""
+	returns the draw call which packs the line plot data dictionaries `pdicts`, all
+	sharing the same collection_key() , into one LineCollection
+
+	returns a drawcall
+	"""
+	segments 	= []
+	colors 		= []
+	labels 		= []
+	for pd in pdicts:
+		segments.append(np.column_stack([np.asarray(pd['x'],dtype=float),np.asarray(pd['y'],dtype=float)]))
+		colors.append(pd['color'])
+		labels.append(None if pd['label'] in skip_labels else pd['label'])
+	kw = {}
+	for key in _COLLECTION_STYLE:
+		if pdicts[0].get(key) is not None:
+			kw[key] = pdicts[0][key]
+	if label is not None:
+		kw['label'] = label
+	return plan_call('_collection',tuple(segments),tuple(colors),tuple(labels),**kw)
+
+# savefig() formats of the raw canvas pixels
+_RAW_FORMATS = ['rgba','raw']
+
+def buffer_matches_savefig(fig,sf):
+	"""
+	returns True if the Agg canvas of `fig` , drawn at the output dpi , holds the image
+	savefig() renders with the savefig settings `sf` (no transparency , colors , bounding
+	box or backend changed for the output)
+	"""
+	if not hasattr(fig.canvas,'buffer_rgba') or sf.get('transparent') or 'backend' in sf:
+		return False
+	if any(key in sf for key in ['facecolor','edgecolor','bbox_inches']):
+		return False
+	return rcParams['savefig.facecolor'] == 'auto' and rcParams['savefig.edgecolor'] == 'auto' and \
+		rcParams['savefig.bbox'] != 'tight'
+
+def canvas_buffer(fig,sf):
+	"""
+	draws `fig` at the dpi of the savefig settings `sf` and returns its pixels as a
+	(height , width , 4) uint8 RGBA array. the array is a view of the Agg canvas buffer ,
+	valid until the figure is drawn again. when the canvas can not be used as is (other
+	backend , transparent output ...) the pixels are rendered by savefig() and copied.
+	"""
+	dpi = sf.get('dpi',fig.dpi)
+	if buffer_matches_savefig(fig,sf) and dpi != 'figure':
+		old = fig.dpi
+		fig.dpi = dpi
+		try:
+			fig.canvas.draw()
+		finally:
+			fig.dpi = old
+		return np.asarray(fig.canvas.buffer_rgba())
+	if dpi == 'figure':
+		dpi = fig.dpi
+	buf 	= BytesIO()
+	fig.savefig(buf,**dict(sf,format='rgba',dpi=dpi))
+	width , height = fig.get_size_inches() * dpi
+	return np.frombuffer(buf.getvalue(),dtype=np.uint8).reshape(int(height),int(width),4)
+
+## RENDER PLAN
+class frozendict(dict):
+	"""
+	read-only dictionary, used to keep the keyword arguments of a render plan
+	from being modified while it is drawn.
+	"""
+	def _readonly(self,*args,**kwargs):
+		raise TypeError('frozendict is read-only')
+
+	__setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+	def __reduce__(self):
+		return (frozendict,(dict(self),))
+
+# a single resolved call on a matplotlib axes object
+drawcall 	= namedtuple('drawcall',['method','args','kwargs'])
+# axes placement and ordered draw calls of a layer
+layerplan 	= namedtuple('layerplan',['name','twin','twin_ref','location','calls','series'])
+# the full plan produced by kaplot.compilePlot()
+renderplan 	= namedtuple('renderplan',['style','xkcd','layers'])
+
+def plan_call(method,*args,**kwargs):
+	"""
+	builds a `drawcall`. `method` is either the name of an axes method or one of
+	the plan operations in _PLAN_OPS, which need the axes object to resolve their
+	arguments.
+
+	returns a drawcall
+	"""
+	return drawcall(method,tuple(args),frozendict(kwargs))
+
+def run_calls(ax,calls):
+	"""
+	executes the draw calls `calls` on the axes object `ax`. the calls are not modified.
+
+	** args **
+	ax 		- matplotlib axes object
+	calls 	- iterable of drawcall
+
+	returns the list of values returned by the calls (artists , containers , ...)
+	"""
+	results = []
+	for call in calls:
+		if call.method in _PLAN_OPS:
+			results.append(_PLAN_OPS[call.method](ax,*call.args,**call.kwargs))
+		else:
+			results.append(getattr(ax,call.method)(*call.args,**call.kwargs))
+	return results
+
+def _op_formatter(ax):
+	frmtr = ScalarFormatter(useOffset=False)
+	ax.get_yaxis().set_major_formatter(frmtr)
+	ax.get_xaxis().set_major_formatter(frmtr)
+
+def _op_line(ax,x,y,**kwargs):
+	# same unit handling and lazy autoscaling as Axes.plot
+	ax.xaxis.update_units(x)
+	ax.yaxis.update_units(y)
+	line = ax.add_line(Line2D(x,y,**kwargs))
+	if hasattr(ax,'_request_autoscale_view'):
+		ax._request_autoscale_view()
+	else:
+		ax.autoscale_view()
+	return line
+
+def _op_collection(ax,segments,colors,labels,**kwargs):
+	# same z-order as the line data of errorbar()
+	lc = LineCollection(segments,colors=colors,zorder=2.1,**kwargs)
+	ax.add_collection(lc)
+	if hasattr(ax,'_request_autoscale_view'):
+		ax._request_autoscale_view()
+	else:
+		ax.autoscale_view()
+	# legend only entries for labelled data sets
+	kwargs.pop('label',None)
+	for color,label in zip(colors,labels):
+		if label is not None:
+			ax.add_line(Line2D([],[],color=color,label=label,**kwargs))
+
+def _op_ticklabels(ax,axis,**prop):
+	if axis == 'x':
+		ax.set_xticklabels(ax.get_xticklabels(),**prop)
+	else:
+		ax.set_yticklabels(ax.get_yticklabels(),**prop)
+
+def _op_spine(ax,side):
+	ax.spines[side].set_color('None')
+
+def _op_axhline(ax,**kwargs):
+	# convert xmin and xmax values to x,y values
+	if 'xmin' in kwargs:
+		kwargs['xmin'] = convert_xy(ax,kwargs['xmin'],0)[0]
+	if 'xmax' in kwargs:
+		kwargs['xmax'] = convert_xy(ax,kwargs['xmax'],0)[0]
+	ax.axhline(**kwargs)
+
+def _op_axvline(ax,**kwargs):
+	# convert ymin and ymax values to x,y values
+	if 'ymin' in kwargs:
+		kwargs['ymin'] = convert_xy(ax,0,kwargs['ymin'])[1]
+	if 'ymax' in kwargs:
+		kwargs['ymax'] = convert_xy(ax,0,kwargs['ymax'])[1]
+	ax.axvline(**kwargs)
+
+def _op_axhspan(ax,**kwargs):
+	# y-coords are in data , x-coords are in axes units
+	kwargs['xmin'] = convert_xy(ax,kwargs['xmin'],0)[0]
+	kwargs['xmax'] = convert_xy(ax,kwargs['xmax'],0)[0]
+	ax.axhspan(**kwargs)
+
+def _op_legend(ax,fprop,**props):
+	l = ax.legend(prop=fprop,**props)
+	# update the legend title also
+	if props.get('title') is not None:
+		setp(l.get_title(),**fprop)
+
+def _op_boxplot(ax,x_list,labels,positions,fill_colors,bsargs,scatter=None,**bpargs):
+	# make the box plot complete with box filling
+	if any(isinstance(x,quantilesketch) for x in x_list):
+		res_dict = sketch_boxplot(ax,x_list,labels,positions,**bpargs)
+		# the boxscatter overlay draws an even sample of every sketch
+		x_list = [x.sample() if isinstance(x,quantilesketch) else x for x in x_list]
+	else:
+		bpargs[_BOXPLOT_LABELS] = labels
+		res_dict = ax.boxplot(x=x_list,positions=positions,**bpargs)
+	for ind,box in enumerate(res_dict['boxes']):
+		# update box fill color
+		color = fill_colors[ind]
+		if color != 'Auto':
+			box.set_facecolor(color)
+			box.set_zorder(0)
+		else:
+			box.set_facecolor('None')
+	# add the scatter option overtop
+	if bsargs is not None:
+		vert 	= bpargs.get('vert',True) != False
+		pos , val = boxscatter_points(res_dict['whiskers'],x_list,positions,vert,**scatter)
+		if not vert:
+			# horizontal boxplot, swap
+			ax.scatter(val,pos,**bsargs)
+		else:
+			ax.scatter(pos,val,**bsargs)
+
+def sketch_boxplot(ax,x_list,labels,positions,whis=1.5,sym=None,notch=False,manage_xticks=True,**bpargs):
+	"""
+	draws a box plot through the precomputed statistics path , Axes.bxp , for layers
+	holding quantilesketch data. sketches provide their own statistics , raw data sets
+	use cbook.boxplot_stats. takes the Axes.boxplot arguments used by kaplot.
+
+	returns the artist dictionary of Axes.bxp
+	"""
+	stats = []
+	for x,label in zip(x_list,labels):
+		if isinstance(x,quantilesketch):
+			st = x.stats(whis)
+		else:
+			st = cbook.boxplot_stats(np.asarray(x,dtype=float).ravel(),whis=whis)[0]
+		if label is not None:
+			st['label'] = label
+		stats.append(st)
+	if sym == '':
+		bpargs['showfliers'] = False
+	elif sym:
+		bpargs['flierprops'] = dict(marker=sym,**(bpargs.get('flierprops') or {}))
+	return ax.bxp(stats,positions=positions,shownotches=notch,manage_ticks=manage_xticks,**bpargs)
+
+def boxscatter_points(whiskers,x_list,positions,vert=True,seed=0,max_points=None,jitter=0.04):
+	"""
+	returns the (position, value) arrays scattered over a box plot. only the values
+	between the whisker ends drawn by matplotlib are kept , the outliers are already
+	shown as fliers. positions are jittered by a multiple of 0.01 up to `jitter`.
+
+	** args **
+	whiskers 	- whisker lines returned by Axes.boxplot , two per box
+	x_list 		- list of data arrays , one per box
+	positions 	- box positions
+	vert 		- True/False , vertical box plot
+
+	** kwargs **
+	seed 		- seed of the jitter and subsample random generator , None for a random seed
+	max_points 	- maximum number of points per box , larger groups are subsampled
+				  evenly over their sorted values (stratified)
+	jitter 		- largest position offset
+
+	returns (positions , values) tuple of arrays
+	"""
+	rng 	= np.random.default_rng(seed)
+	steps 	= int(round(jitter*100))
+	pos_parts , val_parts = [] , []
+	for ind,pos in enumerate(positions):
+		vals 	= np.asarray(x_list[ind],dtype=float).ravel()
+		# whisker lines run from the quartile to the whisker end
+		lo , hi = [w.get_ydata()[1] if vert else w.get_xdata()[1] for w in whiskers[2*ind:2*ind+2]]
+		vals 	= vals[(vals >= lo) & (vals <= hi)]
+		# check for single value
+		if len(vals) == 1:
+			continue
+		if max_points is not None and len(vals) > max_points:
+			vals 	= np.sort(vals)
+			edges 	= np.linspace(0,len(vals),max_points+1).astype(int)
+			pick 	= edges[:-1] + (rng.random(max_points)*(edges[1:]-edges[:-1])).astype(int)
+			vals 	= vals[pick]
+		# make it jitter
+		val_parts.append(vals)
+		pos_parts.append(pos + rng.integers(-steps,steps+1,len(vals))/100.0)
+	if len(val_parts) == 0:
+		return (np.empty(0),np.empty(0))
+	return (np.concatenate(pos_parts),np.concatenate(val_parts))
+
+# plan operations which need the axes object to resolve their arguments
+_PLAN_OPS = {	'_formatter'	:	_op_formatter	, \
+				'_line'			:	_op_line		, \
+				'_collection'	:	_op_collection	, \
+				'_ticklabels'	:	_op_ticklabels	, \
+				'_spine'		:	_op_spine		, \
+				'_axhline'		:	_op_axhline		, \
+				'_axvline'		:	_op_axvline		, \
+				'_axhspan'		:	_op_axhspan		, \
+				'_legend'		:	_op_legend		, \
+				'_boxplot'		:	_op_boxplot}
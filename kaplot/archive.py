@@ -0,0 +1,142 @@
+"""
+File format of kaplot.saveObj() / kaplot.loadObj().
+
+An archive holds the plot spec as a small JSON document, and the data arrays it refers to as
+raw, uncompressed blocks. loadObj() memory-maps the blocks, so opening an archive only reads
+the header and the document ; the data pages are read when a plot draws them.
+
+Layout :
+
+	offset 0 	magic 'KAPLOTA1' , then the offset and length of the document (2 x uint64, little endian)
+	offset 64 	array blocks , each starting at a multiple of 64 bytes
+	end 		JSON document (utf-8)
+
+Values of the document are JSON types , with tagged objects for everything else :
+
+	{"__tuple__" : [...]} 			tuple
+	{"__dict__" : [[key,value],...]} 	dictionary with keys which are not strings
+	{"__array__" : i} 				array i of the "arrays" table (dtype , shape , offset)
+	{"__pickle__" : i} 				array i holds a pickled object , used for objects without
+									a structured form (e.g. datasource , histaccumulator)
+"""
+
+from collections.abc import Mapping
+import json
+import os
+import pickle
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC 	= b'KAPLOTA1'
+ALIGN 	= 64
+_HEADER = struct.Struct('<8sQQ')
+_TAGS 	= ['__tuple__','__dict__','__array__','__pickle__']
+
+def is_archive(fname):
+	"""
+	returns True if the file `fname` starts with the archive magic
+	"""
+	with open(fname,'rb') as fp:
+		return fp.read(len(MAGIC)) == MAGIC
+
+def write_archive(fp,obj):
+	"""
+	writes `obj` (nested dictionaries , lists , arrays ...) as an archive to the seekable
+	binary file object `fp`
+	"""
+	arrays 	= []
+	doc 	= _encode(obj,arrays)
+	start 	= fp.tell()
+	fp.write(b'\0' * ALIGN)
+	table 	= []
+	for arr in arrays:
+		pos 	= fp.tell() - start
+		pad 	= -pos % ALIGN
+		fp.write(b'\0' * pad)
+		table.append({'dtype' : arr.dtype.str , 'shape' : list(arr.shape) , 'offset' : pos + pad})
+		if arr.size:
+			fp.write(arr.data)
+	text 	= json.dumps({'arrays' : table , 'doc' : doc},separators=(',',':')).encode('utf-8')
+	pos 	= fp.tell() - start
+	fp.write(text)
+	end 	= fp.tell()
+	fp.seek(start)
+	fp.write(_HEADER.pack(MAGIC,pos,len(text)))
+	fp.seek(end)
+	return
+
+def save_archive(fname,obj):
+	"""
+	writes `obj` to the archive file `fname`. the file is replaced atomically , so an archive
+	which is memory-mapped (e.g. by the object being saved) stays valid
+	"""
+	fd , tmp = tempfile.mkstemp(prefix='.kaplot',dir=os.path.dirname(os.path.abspath(fname)))
+	try:
+		with os.fdopen(fd,'wb') as fp:
+			write_archive(fp,obj)
+		os.replace(tmp,fname)
+	except BaseException:
+		os.unlink(tmp)
+		raise
+	return
+
+def load_archive(fname):
+	"""
+	reads the archive file `fname` , returns the stored object with its arrays memory-mapped
+	(read only)
+	"""
+	with open(fname,'rb') as fp:
+		magic , pos , length = _HEADER.unpack(fp.read(_HEADER.size))
+		if magic != MAGIC:
+			raise ValueError('kaplot: %s is not a kaplot archive' % fname)
+		fp.seek(pos)
+		meta = json.loads(fp.read(length).decode('utf-8'))
+	table = meta['arrays']
+	if not table:
+		return _decode(meta['doc'],[])
+	mm 		= np.memmap(fname,dtype=np.uint8,mode='r',shape=(pos,))
+	arrays 	= []
+	for entry in table:
+		dtype 	= np.dtype(entry['dtype'])
+		shape 	= tuple(entry['shape'])
+		nbytes 	= int(np.prod(shape,dtype=np.int64)) * dtype.itemsize
+		offset 	= entry['offset']
+		arrays.append(mm[offset:offset+nbytes].view(dtype).reshape(shape))
+	return _decode(meta['doc'],arrays)
+
+def _encode(value,arrays):
+	if value is None or isinstance(value,(bool,int,float,str)):
+		return value
+	if isinstance(value,np.generic) and value.dtype.kind in 'biuf':
+		return value.item()
+	if isinstance(value,(list,tuple)):
+		items = [_encode(v,arrays) for v in value]
+		return items if isinstance(value,list) else {'__tuple__' : items}
+	if isinstance(value,Mapping):
+		if all(isinstance(k,str) and k not in _TAGS for k in value):
+			return dict((k,_encode(v,arrays)) for k,v in value.items())
+		return {'__dict__' : [[_encode(k,arrays),_encode(v,arrays)] for k,v in value.items()]}
+	if type(value) in (np.ndarray,np.memmap) and not value.dtype.hasobject:
+		arrays.append(np.ascontiguousarray(value))
+		return {'__array__' : len(arrays) - 1}
+	arrays.append(np.frombuffer(pickle.dumps(value,pickle.HIGHEST_PROTOCOL),dtype=np.uint8))
+	return {'__pickle__' : len(arrays) - 1}
+
+def _decode(value,arrays):
+	if isinstance(value,list):
+		return [_decode(v,arrays) for v in value]
+	if not isinstance(value,dict):
+		return value
+	if len(value) == 1:
+		key = next(iter(value))
+		if key == '__tuple__':
+			return tuple(_decode(v,arrays) for v in value[key])
+		if key == '__dict__':
+			return dict((_decode(k,arrays),_decode(v,arrays)) for k,v in value[key])
+		if key == '__array__':
+			return arrays[value[key]]
+		if key == '__pickle__':
+			return pickle.loads(arrays[value[key]])
+	return dict((k,_decode(v,arrays)) for k,v in value.items())
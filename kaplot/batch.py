@@ -0,0 +1,97 @@
+"""
+Batch rendering of many kaplot figures over a pool of worker processes.
+
+Usage:
+
+	from kaplot import render_many
+	results = render_many([(kobj1,'fig1.png'),(kobj2,'fig2.png',{'dpi':300})],workers=8)
+
+Every worker renders with the headless Agg backend and is replaced after `recycle` jobs,
+which caps the memory held by long lived matplotlib processes. A failing job does not stop
+the batch; its error is reported in the returned list instead.
+"""
+
+import multiprocessing
+import time
+import traceback
+
+def render_many(jobs,workers=None,recycle=100,chunksize=1):
+	"""
+	renders and saves many figures in parallel
+
+	** args **
+	jobs 		- iterable of (figure, fname) or (figure, fname, savekwargs) tuples.
+				  `figure` is a kaplot object or a picklable callable which returns one,
+				  `fname` a file name or a list of outputs saved from one draw (see saveMe()),
+				  `savekwargs` is a dictionary passed on to saveMe() , e.g.
+				  {'dpi' : 300 , 'cache' : rendercache(path)}
+	workers 	- number of worker processes, defaults to the number of cores.
+				  0 renders every job in the calling process , with its backend
+	recycle 	- number of jobs a worker renders before it is replaced
+	chunksize 	- number of jobs sent to a worker at once
+
+	returns a list, in job order, of dictionaries with the keys
+		index 	- position of the job in `jobs`
+		fname 	- output file name
+		ok 		- True/False , job finished without error
+		error 	- formatted traceback, or None
+		time 	- wall time of the job in seconds
+	"""
+	jobs = list(enumerate(jobs))
+	if workers == 0:
+		# the backend of the calling process is left as it is , saving needs no display
+		return [_render_job(job) for job in jobs]
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	workers = max(1,min(workers,len(jobs)))
+	pool = multiprocessing.Pool(processes=workers,initializer=_init_worker,maxtasksperchild=recycle)
+	try:
+		results = pool.map(_render_job,jobs,chunksize)
+	finally:
+		pool.close()
+		pool.join()
+	return results
+
+def _init_worker():
+	"""
+	switches the worker to the non-interactive Agg backend , and loads pyplot through kaplot
+	so the backend and the kaplot rc settings are applied (a spawned worker starts without
+	pyplot)
+	"""
+	from kaplot_backend import set_backend
+	from . import _load
+	set_backend('agg')
+	_load(pyplot=True)
+
+def _render_job(job):
+	"""
+	renders a single (index, job) pair , always returns a result dictionary
+	"""
+	from . import _load
+	# loads pyplot with the kaplot rc settings before the job figure is made
+	_load(pyplot=True)
+	import matplotlib.pyplot as plt
+	ind , job = job
+	fname 	= job[1]
+	skw 	= job[2] if len(job) > 2 else {}
+	result 	= {'index' : ind , 'fname' : fname , 'ok' : False , 'error' : None , 'time' : 0.0}
+	start 	= time.time()
+	# figures of the calling process (workers=0) are left open
+	opened 	= set(plt.get_fignums())
+	try:
+		plt.figure()
+		kobj = job[0]
+		if callable(kobj):
+			kobj = kobj()
+		# with a render cache , saveMe() only draws the figure on a cache miss
+		if skw.get('cache') is None:
+			kobj.makePlot()
+		kobj.saveMe(fname,**skw)
+		result['ok'] = True
+	except Exception:
+		result['error'] = traceback.format_exc()
+	finally:
+		for num in set(plt.get_fignums()) - opened:
+			plt.close(num)
+	result['time'] = time.time() - start
+	return result
@@ -0,0 +1,240 @@
+"""
+Content-addressed cache of rendered figures for saveMe().
+
+saveMe(fname,cache=...) fingerprints everything the output depends on : the resolved settings,
+the layer specs, the contents of the data arrays (the size and modification time for file
+backed datasources), the savefig settings and output format, and the kaplot and matplotlib
+versions. When a file with the same fingerprint is in the cache, it is copied to `fname` and
+the figure is not drawn at all ; otherwise the figure is drawn, saved, and added to the cache.
+
+Usage:
+
+	cache = rendercache('~/.cache/kaplot',max_size=2**30)
+	for kobj,fname in figures:
+		kobj.saveMe(fname,cache=cache)		# no makePlot() needed
+		png = kobj.saveMe(None,cache=cache,format='png')	# contents as bytes
+
+- the cache is a directory of files named by their fingerprint , shared safely between
+  processes : entries are written to a temporary file and renamed into place.
+- the least recently used entries are removed when the cache grows beyond `max_size` bytes.
+  a hit refreshes the modification time of its entry , which is the LRU order.
+- changes made to the matplotlib rcParams outside of kaplot (e.g. rcParams.update() in user
+  code) are not part of the fingerprint.
+"""
+
+from collections.abc import Mapping
+import hashlib
+import os
+import os.path as osp
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+
+class rendercache(object):
+	"""
+	directory of rendered figures , keyed by fingerprint
+
+	** args **
+	path 		- cache directory , created when missing
+	max_size 	- size limit of the cache in bytes
+	"""
+	def __init__(self,path,max_size=2**30):
+		self.path 		= osp.abspath(osp.expanduser(path))
+		self.max_size 	= int(max_size)
+		self._size 		= None
+		self._lock 		= threading.Lock()
+		if not osp.isdir(self.path):
+			os.makedirs(self.path,exist_ok=True)
+
+	def __getstate__(self):
+		return {'path' : self.path , 'max_size' : self.max_size}
+
+	def __setstate__(self,state):
+		self.__init__(**state)
+
+	def __repr__(self):
+		return 'rendercache(%r,max_size=%r)' % (self.path,self.max_size)
+
+	def entry(self,key,ext=''):
+		"""
+		returns the file name of the entry `key`
+		"""
+		return osp.join(self.path,key[:2],key + ext)
+
+	def fetch(self,key,fname,ext=''):
+		"""
+		copies the entry `key` to `fname` (file name or binary file object) , returns False
+		when there is no such entry
+		"""
+		entry = self.entry(key,ext)
+		try:
+			src = open(entry,'rb')
+		except (IOError,OSError):
+			return False
+		with src:
+			if hasattr(fname,'write'):
+				shutil.copyfileobj(src,fname)
+			else:
+				with open(fname,'wb') as dst:
+					shutil.copyfileobj(src,dst)
+		try:
+			os.utime(entry,None)
+		except OSError:
+			pass
+		return True
+
+	def store(self,key,fname,ext=''):
+		"""
+		adds the file `fname` (file name , or the file contents as bytes) as entry `key` , and
+		evicts old entries when the cache is full
+		"""
+		entry = self.entry(key,ext)
+		if not osp.isdir(osp.dirname(entry)):
+			os.makedirs(osp.dirname(entry),exist_ok=True)
+		fd , tmp = tempfile.mkstemp(prefix='.tmp',dir=osp.dirname(entry))
+		try:
+			with os.fdopen(fd,'wb') as dst:
+				if isinstance(fname,bytes):
+					dst.write(fname)
+				else:
+					with open(fname,'rb') as src:
+						shutil.copyfileobj(src,dst)
+			os.replace(tmp,entry)
+		except BaseException:
+			os.unlink(tmp)
+			raise
+		with self._lock:
+			if self._size is None:
+				self._size = self.size()
+			else:
+				self._size += osp.getsize(entry)
+			full = self._size > self.max_size
+		if full:
+			self.evict()
+		return
+
+	def _entries(self):
+		"""
+		returns a list of (mtime , size , file name) of all entries
+		"""
+		entries = []
+		for sub in os.listdir(self.path):
+			subdir = osp.join(self.path,sub)
+			if not osp.isdir(subdir):
+				continue
+			for name in os.listdir(subdir):
+				if name.startswith('.tmp'):
+					continue
+				try:
+					st = os.stat(osp.join(subdir,name))
+				except OSError:
+					continue
+				entries.append((st.st_mtime,st.st_size,osp.join(subdir,name)))
+		return entries
+
+	def size(self):
+		"""
+		returns the total size of the cache entries in bytes
+		"""
+		return sum(e[1] for e in self._entries())
+
+	def evict(self,max_size=None):
+		"""
+		removes the least recently used entries until the cache is within 90% of `max_size`
+		(defaults to the size limit of the cache)
+		"""
+		if max_size is None:
+			max_size = self.max_size
+		entries = sorted(self._entries())
+		total 	= sum(e[1] for e in entries)
+		for mtime,size,name in entries:
+			if total <= 0.9 * max_size:
+				break
+			try:
+				os.unlink(name)
+			except OSError:
+				continue
+			total -= size
+		with self._lock:
+			self._size = total
+		return
+
+	def clear(self):
+		"""
+		removes every entry
+		"""
+		self.evict(0)
+		return
+
+def render_cache(cache):
+	"""
+	returns `cache` as a rendercache , a directory name is opened with the default size limit
+	"""
+	if isinstance(cache,rendercache):
+		return cache
+	return rendercache(cache)
+
+_MPL_VERSION = None
+
+def matplotlib_version():
+	"""
+	returns the matplotlib version , without importing matplotlib when it is not loaded yet
+	"""
+	if 'matplotlib' in sys.modules:
+		return sys.modules['matplotlib'].__version__
+	global _MPL_VERSION
+	if _MPL_VERSION is None:
+		from importlib.metadata import version
+		_MPL_VERSION = version('matplotlib')
+	return _MPL_VERSION
+
+def fingerprint(*values):
+	"""
+	returns the hex sha1 digest of `values` , nested dictionaries, lists, tuples, arrays and
+	plain values. dictionaries are hashed in key order , arrays by dtype, shape and contents ,
+	datasources by their file's size and modification time , anything else by its pickle.
+	"""
+	h = hashlib.sha1()
+	for value in values:
+		_feed(h,value)
+	return h.hexdigest()
+
+def _feed(h,value):
+	if value is None or isinstance(value,(bool,int,float,str)):
+		h.update(('%s:%r;' % (type(value).__name__,value)).encode('utf-8'))
+		return
+	if isinstance(value,(list,tuple)):
+		h.update(('%s:%d[' % (type(value).__name__,len(value))).encode('utf-8'))
+		for v in value:
+			_feed(h,v)
+		h.update(b']')
+		return
+	if isinstance(value,Mapping):
+		h.update(('dict:%d{' % len(value)).encode('utf-8'))
+		for k in sorted(value,key=repr):
+			_feed(h,k)
+			_feed(h,value[k])
+		h.update(b'}')
+		return
+	np = sys.modules.get('numpy')
+	if np is not None and isinstance(value,np.ndarray) and not value.dtype.hasobject:
+		h.update(('array:%s:%r;' % (value.dtype.str,value.shape)).encode('utf-8'))
+		h.update(np.ascontiguousarray(value).reshape(-1).view(np.uint8))
+		return
+	if np is not None and isinstance(value,np.generic):
+		_feed(h,value.item())
+		return
+	ds = sys.modules.get('kaplot.datasource')
+	if ds is not None and isinstance(value,ds.datasource):
+		try:
+			st = os.stat(value.path)
+			stamp = (st.st_size,st.st_mtime_ns)
+		except OSError:
+			stamp = None
+		_feed(h,(repr(value),stamp))
+		return
+	data = pickle.dumps(value,pickle.HIGHEST_PROTOCOL)
+	h.update(b'pickle:' + struct.pack('<Q',len(data)) + data)
@@ -0,0 +1,140 @@
+"""
+File backed data sets for add_plotdata().
+
+A datasource names a column of a .npy or .npz file instead of holding the data. Nothing is read
+when it is created or added to a layer ; the file is memory-mapped when makePlot() needs the
+values, so only the pages that are drawn are ever read from disk.
+
+Usage:
+
+	x = datasource('run1.npz',key='time',sorted=True)
+	y = datasource('run1.npz',key='signal')
+	kobj.add_plotdata(x,y,decimate='minmax')
+	kobj.set_xlim(min=10.,max=20.)
+
+- .npy files and stored (np.savez) .npz members are memory-mapped. compressed members
+  (np.savez_compressed) can not be mapped and are read in full when rendered.
+- `sorted=True` declares the x values as non-decreasing. line data sets with a sorted x source
+  are then culled to the x limits of the layer with a binary search before decimation , so the
+  pages outside of the limits are not touched.
+- a datasource only stores its arguments , kaplot objects holding them stay small and picklable.
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+
+class datasource(object):
+	"""
+	lazily memory-mapped data column
+
+	** args **
+	path 	- .npy or .npz file name
+	key 	- array name within a .npz file , defaults to the only array in the file
+	column 	- column of a 2D array , or field name of a structured array
+	index 	- slice (or index array) applied along the first axis
+	sorted 	- True/False , the values are non-decreasing (allows culling of x data)
+	"""
+	def __init__(self,path,key=None,column=None,index=None,sorted=False):
+		self.path 	= path
+		self.key 	= key
+		self.column = column
+		self.index 	= index
+		self.sorted = sorted
+		self._array = None
+
+	def __getstate__(self):
+		state = dict(self.__dict__)
+		state['_array'] = None
+		return state
+
+	def __repr__(self):
+		return 'datasource(%r,key=%r,column=%r,index=%r)' % (self.path,self.key,self.column,self.index)
+
+	def array(self):
+		"""
+		returns the data as a (memory-mapped) array , the mapping is opened on first use
+		"""
+		if self._array is None:
+			arr = open_array(self.path,self.key)
+			if self.index is not None:
+				arr = arr[self.index]
+			if self.column is not None:
+				arr = arr[self.column] if arr.dtype.names else arr[:,self.column]
+			self._array = arr
+		return self._array
+
+	def close(self):
+		"""
+		drops the mapping , it is reopened when the data is needed again
+		"""
+		self._array = None
+
+def open_array(path,key=None):
+	"""
+	returns the array stored in a .npy file , or member `key` of a .npz file , memory-mapped
+	when the file layout allows it
+	"""
+	if not zipfile.is_zipfile(path):
+		return np.load(path,mmap_mode='r')
+	with zipfile.ZipFile(path) as zf:
+		names = [n[:-4] for n in zf.namelist() if n.endswith('.npy')]
+		if key is None:
+			if len(names) != 1:
+				raise ValueError('kaplot: datasource key required , %s holds %s' % (path,names))
+			key = names[0]
+		info = zf.getinfo(key + '.npy')
+	if info.compress_type != zipfile.ZIP_STORED:
+		return np.load(path)[key]
+	with open(path,'rb') as fp:
+		# the member data follows its local file header
+		fp.seek(info.header_offset)
+		nlen , elen = struct.unpack('<HH',fp.read(30)[26:30])
+		fp.seek(info.header_offset + 30 + nlen + elen)
+		version = np.lib.format.read_magic(fp)
+		if version == (1,0):
+			shape , fortran , dtype = np.lib.format.read_array_header_1_0(fp)
+		else:
+			shape , fortran , dtype = np.lib.format.read_array_header_2_0(fp)
+		offset = fp.tell()
+	if dtype.hasobject:
+		return np.load(path,allow_pickle=True)[key]
+	return np.memmap(path,dtype=dtype,mode='r',offset=offset,shape=shape,order='F' if fortran else 'C')
+
+def resolve_sources(pdict,xlim=None):
+	"""
+	returns the plot data dictionary `pdict` with its datasource columns replaced by arrays.
+	when x is a sorted datasource and `xlim` is given, all columns of x's length are culled
+	to the x range , keeping one point beyond each limit so the line reaches the frame.
+
+	** args **
+	pdict 	- plot data dictionary
+	xlim 	- [xmin , xmax] , either may be None
+	"""
+	keys = [key for key in ['x','y','xerr','yerr'] if isinstance(pdict.get(key),datasource)]
+	if not keys:
+		return pdict
+	x 		= pdict.get('x')
+	pdict 	= dict(pdict)
+	for key in keys:
+		pdict[key] = pdict[key].array()
+	if not isinstance(x,datasource) or not x.sorted or xlim is None:
+		return pdict
+	xmin , xmax = xlim
+	if xmin is None and xmax is None:
+		return pdict
+	if xmin is not None and xmax is not None:
+		xmin , xmax = min(xmin,xmax) , max(xmin,xmax)
+	xarr 	= pdict['x']
+	n 		= len(xarr)
+	lo , hi = 0 , n
+	if xmin is not None:
+		lo = max(int(np.searchsorted(xarr,xmin,side='left')) - 1,0)
+	if xmax is not None:
+		hi = min(int(np.searchsorted(xarr,xmax,side='right')) + 1,n)
+	for key in ['x','y','xerr','yerr']:
+		val = pdict.get(key)
+		if isinstance(val,np.ndarray) and val.ndim and val.shape[-1] == n:
+			pdict[key] = val[...,lo:hi]
+	return pdict
@@ -0,0 +1,130 @@
+"""
+Visual preserving decimation of line data, used by kaplot before the line artists are created.
+
+Both methods return the indices of the points to keep, so error bars and any other per point
+data can be reduced along with x and y.
+
+- minmax 	: keeps the first, minimum, maximum and last point of every column, which keeps
+			  the envelope of the line and its extremes. close to the full resolution line ,
+			  but not pixel exact : the columns split the x range of the data , not the pixel
+			  columns of the axes.
+- lttb 		: largest-triangle-three-buckets, keeps one point per bucket chosen to preserve
+			  the shape of the line. produces fewer points, and differs more from the full line.
+
+kaplot decimates when the plot is compiled , before the axes are laid out , and uses the
+figure width in pixels (SAVEFIG_SETTINGS width * dpi) as the number of columns. the axes are
+narrower than the figure , so a column is at most one pixel wide.
+
+Decimation requires x to be sorted (non-decreasing); other data is returned untouched.
+"""
+
+import numpy as np
+
+METHODS = ['minmax', 'lttb']
+
+def decimate_indices(method,x,y,ncols):
+	"""
+	returns the indices of the points to draw for a line spanning `ncols` pixel columns,
+	or None if the data should be drawn as is.
+
+	** args **
+	method 	- 'minmax' or 'lttb'
+	x 		- x data array
+	y 		- y data array
+	ncols 	- number of pixel columns
+	"""
+	x = np.asarray(x)
+	y = np.asarray(y)
+	n = len(x)
+	ncols = int(ncols)
+	if method not in METHODS:
+		raise ValueError('decimate method must be one of %s' % METHODS)
+	if x.ndim != 1 or y.shape != x.shape or n <= 4*ncols or ncols < 1:
+		return None
+	if not np.all(x[1:] >= x[:-1]):
+		return None
+	if method == 'minmax':
+		return minmax_indices(x,y,ncols)
+	return lttb_indices(x,y,2*ncols)
+
+def minmax_indices(x,y,ncols):
+	"""
+	min-max decimation. splits the sorted x range into `ncols` equal columns and keeps the
+	first, last, minimum and maximum point of each.
+
+	returns a sorted index array
+	"""
+	edges 	= np.linspace(x[0],x[-1],ncols+1)
+	starts 	= np.unique(np.searchsorted(x,edges[:-1],side='left'))
+	starts 	= starts[starts < len(x)]
+	stops 	= np.append(starts[1:],len(x))
+	# column id of every point
+	col 	= np.repeat(np.arange(len(starts)),stops-starts)
+	keep 	= [starts,stops-1]
+	for reduce in [np.fmin,np.fmax]:
+		ext 	= reduce.reduceat(y,starts)
+		hit 	= np.flatnonzero(y == ext[col])
+		# first hit in each column
+		first 	= np.unique(col[hit],return_index=True)[1]
+		keep.append(hit[first])
+	return np.unique(np.concatenate(keep))
+
+def lttb_indices(x,y,nout):
+	"""
+	largest-triangle-three-buckets decimation to `nout` points.
+
+	returns a sorted index array
+	"""
+	n = len(x)
+	if nout >= n or nout < 3:
+		return np.arange(n)
+	x 		= x.astype(float)
+	y 		= y.astype(float)
+	every 	= (n - 2) / float(nout - 2)
+	bounds 	= (np.arange(nout - 1) * every).astype(int) + 1
+	bounds[-1] = n - 1
+	out 	= np.empty(nout,dtype=np.intp)
+	out[0] 	= 0
+	out[-1] = n - 1
+	a 		= 0
+	for i in range(nout - 2):
+		lo , hi = bounds[i] , bounds[i+1]
+		# average of the next bucket, the last point for the final bucket
+		if i + 2 < len(bounds):
+			nlo , nhi = bounds[i+1] , bounds[i+2]
+			cx , cy = x[nlo:nhi].mean() , y[nlo:nhi].mean()
+		else:
+			cx , cy = x[-1] , y[-1]
+		ax , ay = x[a] , y[a]
+		area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+		a = lo + int(np.nanargmax(area)) if np.any(area == area) else lo
+		out[i+1] = a
+	return out
+
+def decimate_series(pdict,method,ncols,finite=None):
+	"""
+	decimates the x , y , xerr and yerr entries of the plot data dictionary `pdict`.
+	`finite` is an optional mask of the finite points ; only those are decimated and the
+	non finite points are kept , so the gaps they leave in the line stay in place.
+
+	returns a new dictionary , or `pdict` itself when nothing was removed
+	"""
+	if finite is None:
+		ind = decimate_indices(method,pdict['x'],pdict['y'],ncols)
+	else:
+		sel = np.flatnonzero(finite)
+		ind = decimate_indices(method,np.asarray(pdict['x'])[sel],np.asarray(pdict['y'])[sel],ncols)
+		if ind is not None:
+			ind = np.union1d(sel[ind],np.flatnonzero(~finite))
+	if ind is None:
+		return pdict
+	n 		= len(pdict['x'])
+	pdict 	= dict(pdict)
+	for key in ['x','y','xerr','yerr']:
+		val = pdict.get(key)
+		if val is None or np.ndim(val) == 0:
+			continue
+		val = np.asarray(val)
+		if val.shape[-1] == n:
+			pdict[key] = val[...,ind]
+	return pdict
@@ -3,14 +3,23 @@ Defines a couple of default settings dictionaries for importing into a kaplot ob
 They are user overwritable, by passing a custom dictionary (or list of of dicts) to the kaplot `__init__` function.
 Any parameters not specified by the user will come from the `default` settings dictionary.
 
-If it exists, import any user-defined settings from ~/.kaplotdefaults.rc
+If it exists, import any user-defined settings from ~/.kaplotdefaults.rc (or the older
+./kaplot/kaplotdefaults.rc). The rc file is a python file defining settings dictionaries ; it is
+read when a profile is first looked up , and read again only after its modification time changed.
+Its settings are available as attributes of this module and as profile names for kaplot().
 """
 
-from imp import load_source
+import os
 import os.path as osp
+import runpy
+import threading
+
+# user settings files , in increasing priority
+RC_FILES = [osp.join('~','.kaplotdefaults.rc'),osp.join('.','kaplot','kaplotdefaults.rc')]
 
 default = {
 	'PLOT_SETTINGS' 	:	{	'tight_layout'	:	False 		, \
+								'layout_cache'	:	True 		, \
 								'xkcd'			:	False		, \
 								'style'			:	None		, \
 								'x_label_sep_l'	:	' , '		, \
@@ -22,7 +31,9 @@ default = {
 	'SAVEFIG_SETTINGS' 	:	{	'dpi'			:	100		, \
 							  	'transparent'	:	False	, \
 							  	'width'			:	8		, \
-							  	'height'		:	6},
+							  	'height'		:	6		, \
+							  	'format'		:	'Auto'	, \
+							  	'backend'		:	'Auto'},
 
 	'_LOCATION_TIGHT'	:	{	'upper left'	:	[0.18,0.595,0.25,0.25] , \
 								'upper right'	:	[0.70,0.595,0.25,0.25] , \
@@ -162,7 +173,8 @@ default = {
 								'spline'	:	False			, \
 								'sp_order'	:	3				, \
 								'sp_smooth'	:	0 				, \
-								'sp_points'	:	1000},
+								'sp_points'	:	1000			, \
+								'decimate'	:	'Auto'},
 
 	'_BAR_DEFAULTS' 	:	{	'x'			:	None			, \
 								'height'	:	None			, \
@@ -188,6 +200,8 @@ default = {
 
 	'_HIST_DEFAULTS'	:	{	'increment'		: True			, \
 								'bins'			: 'Auto'		, \
+								'counts'		: 'Auto'		, \
+								'edges'			: 'Auto'		, \
 								'min' 			: 'Auto'		, \
 								'max' 			: 'Auto'		, \
 								'normed' 		: 'Auto'		, \
@@ -315,11 +329,75 @@ markers = {
 	'_MARKER_LIST' 		:	['s' , 'o' , '^' , 'D'],
 }
 
-try:
-	kud = load_source('kaplotUserDefaults',osp.join('.','kaplot','kaplotdefaults.rc'))
-	for key,value in kud.__dict__.items():
-		if key.startswith('__'):
+# profiles of this module , by name
+PROFILES = {	'default' 		:	default 		, \
+				'greyscale' 	:	greyscale 		, \
+				'grayscale' 	:	grayscale 		, \
+				'blackandwhite' :	blackandwhite 	, \
+				'bw' 			:	bw 				, \
+				'markers' 		:	markers}
+
+_RC_CACHE 	= {}
+_RC_LOCK 	= threading.Lock()
+
+def rc_stamp():
+	"""
+	returns a key identifying the current state of the user settings files , a tuple of
+	(path , device , inode , modification time) of the files which exist
+	"""
+	stamp = []
+	for path in RC_FILES:
+		if path.startswith('~'):
+			path = osp.expanduser(path)
+		try:
+			st = os.stat(path)
+		except OSError:
 			continue
-		globals()[key] = value
-except IOError:
-	pass
+		stamp.append((path,st.st_dev,st.st_ino,st.st_mtime_ns))
+	return tuple(stamp)
+
+def user_settings(stamp=None):
+	"""
+	returns a dictionary of the settings defined in the user settings files , the files are
+	only executed again when their modification time changed
+
+	** args **
+	stamp 	- result of rc_stamp() , read from the files when None
+	"""
+	if stamp is None:
+		stamp = rc_stamp()
+	with _RC_LOCK:
+		if stamp in _RC_CACHE:
+			return _RC_CACHE[stamp]
+	settings = {}
+	for path,dev,ino,mtime in stamp:
+		for key,value in runpy.run_path(path).items():
+			if not key.startswith('__'):
+				settings[key] = value
+	with _RC_LOCK:
+		_RC_CACHE.clear()
+		_RC_CACHE[stamp] = settings
+	return settings
+
+def profile(name,stamp=None):
+	"""
+	returns the settings dictionary of the profile `name` , from the user settings files or
+	the PROFILES of this module
+
+	** args **
+	name 	- profile name, e.g. 'greyscale'
+	stamp 	- result of rc_stamp() , read from the files when None
+	"""
+	user = user_settings(stamp)
+	if name in user:
+		return user[name]
+	try:
+		return PROFILES[name]
+	except KeyError:
+		raise AttributeError('%s not found in kaplot.defaults or .kaplotdefaults.rc' % name)
+
+def __getattr__(name):
+	user = user_settings()
+	if name in user:
+		return user[name]
+	raise AttributeError('module %r has no attribute %r' % (__name__,name))
@@ -0,0 +1,263 @@
+"""
+Out-of-core histogram accumulation for the 'hist' plot type.
+
+A histaccumulator is fed chunks of data (arrays, memory-mapped arrays or iterators over chunks)
+and only keeps the bin counts, so its memory is bounded by the number of bins and not by the
+number of values seen. Partial accumulators, for example built in different processes, are
+combined with merge(); an accumulator is picklable.
+
+Usage:
+
+	acc = histaccumulator(bins=128)
+	acc.update_from(np.load(fname,mmap_mode='r') for fname in files)
+	kobj.set_plot_type('hist')
+	kobj.add_plotdata(y=acc,label='all runs')
+
+Two binning modes are available :
+
+- fixed 	: `edges` are given, values outside of them are counted in `under` / `over`.
+- auto 		: the bin width is a power of two and the bin edges are multiples of it, so the grid
+			  never has to be guessed up front. When new values do not fit into `bins` bins, the
+			  width is doubled and neighbouring bins are merged, which is exact because all grids
+			  share the same alignment.
+
+NaN and infinite values are skipped and counted in `nan`.
+"""
+
+import numpy as np
+
+class histaccumulator(object):
+	"""
+	incremental histogram with bounded memory
+
+	** args **
+	edges 		- fixed bin edges, if None the edges are decided from the data
+	bins 		- maximum number of bins for automatic edges
+	chunksize 	- number of values binned at once , bounds the temporary memory when
+				  a large (memory-mapped) array is passed to update()
+	"""
+	def __init__(self,edges=None,bins=64,chunksize=2**20):
+		self.chunksize 	= int(chunksize)
+		self.n 			= 0
+		self.nan 		= 0
+		self.under 		= 0
+		self.over 		= 0
+		if edges is not None:
+			edges = np.asarray(edges,dtype=float)
+			if edges.ndim != 1 or len(edges) < 2 or np.any(np.diff(edges) <= 0):
+				raise ValueError('kaplot: histaccumulator edges must be increasing with at least 2 values')
+			self.edges 	= edges
+			self.bins 	= len(edges) - 1
+			self.counts = np.zeros(self.bins,dtype=np.int64)
+			self._uniform = np.allclose(np.diff(edges),edges[1]-edges[0])
+		else:
+			if int(bins) < 2:
+				raise ValueError('kaplot: histaccumulator requires at least 2 bins')
+			self.edges 	= None
+			self.bins 	= int(bins)
+			self.counts = np.zeros(0,dtype=np.int64)
+			# bin width (power of two) and index of the first bin , edges are (lo + i) * width
+			self.width 	= None
+			self.lo 	= 0
+
+	@property
+	def fixed(self):
+		return self.edges is not None
+
+	def update(self,data):
+		"""
+		adds values to the histogram
+
+		** args **
+		data 	- array like , memory-mapped array , or an iterator yielding chunks
+		"""
+		if not isinstance(data,(np.ndarray,list,tuple)) and hasattr(data,'__iter__'):
+			return self.update_from(data)
+		data = np.asarray(data).ravel()
+		for start in range(0,len(data),self.chunksize):
+			self._add(np.asarray(data[start:start+self.chunksize],dtype=float))
+		return self
+
+	def update_from(self,chunks):
+		"""
+		adds every chunk of the iterable `chunks` to the histogram
+		"""
+		for chunk in chunks:
+			self.update(chunk)
+		return self
+
+	def _add(self,x):
+		good = np.isfinite(x)
+		if not good.all():
+			self.nan += int(len(x) - np.count_nonzero(good))
+			x = x[good]
+		if len(x) == 0:
+			return
+		self.n += len(x)
+		if self.fixed:
+			self._add_fixed(x)
+		else:
+			self._add_auto(x)
+
+	def _add_fixed(self,x):
+		e0 , e1 = self.edges[0] , self.edges[-1]
+		self.under 	+= int(np.count_nonzero(x < e0))
+		self.over 	+= int(np.count_nonzero(x > e1))
+		if self._uniform:
+			self.counts += np.histogram(x,bins=self.bins,range=(e0,e1))[0]
+		else:
+			self.counts += np.histogram(x,bins=self.edges)[0]
+
+	def _add_auto(self,x):
+		xmin , xmax = x.min() , x.max()
+		if self.width is None:
+			span = xmax - xmin
+			if span > 0:
+				width = 2.0 ** np.ceil(np.log2(span / (self.bins - 1)))
+			else:
+				width = 2.0 ** np.floor(np.log2(abs(xmin))) if xmin != 0 else 1.0
+			self.width 	= width
+			self.lo 	= int(np.floor(xmin / width))
+			self.counts = np.zeros(1,dtype=np.int64)
+		self._extend(xmin,xmax)
+		ind = np.floor(x / self.width).astype(np.int64) - self.lo
+		self.counts += np.bincount(ind,minlength=len(self.counts))
+
+	def _extend(self,xmin,xmax):
+		"""
+		grows the bin range to cover the values [xmin,xmax]
+		"""
+		self._cover(int(np.floor(xmin / self.width)),int(np.floor(xmax / self.width)))
+
+	def _cover(self,lo,hi):
+		"""
+		grows the bin range to cover the bins [lo,hi] of the current width , coarsening the
+		bins until they fit into `bins`
+		"""
+		lo 		= min(self.lo,lo)
+		hi 		= max(self.lo + len(self.counts) - 1,hi)
+		factor 	= 1
+		while hi // factor - lo // factor + 1 > self.bins:
+			factor *= 2
+		self._regrid(self.width * factor,lo // factor,hi // factor - lo // factor + 1)
+
+	def _regrid(self,width,lo,nbins):
+		"""
+		moves the counts onto the aligned grid of `width` starting at bin `lo`
+		"""
+		factor = int(round(width / self.width))
+		if factor == 1 and lo == self.lo and nbins == len(self.counts):
+			return
+		ind 	= (self.lo + np.arange(len(self.counts))) // factor - lo
+		counts 	= np.zeros(nbins,dtype=np.int64)
+		np.add.at(counts,ind,self.counts)
+		self.counts = counts
+		self.width 	= width
+		self.lo 	= lo
+
+	def _coarsen(self,width):
+		"""
+		merges neighbouring bins until the bin width is `width`
+		"""
+		factor = int(round(width / self.width))
+		self._regrid(width,self.lo // factor,(self.lo + len(self.counts) - 1) // factor - self.lo // factor + 1)
+
+	def merge(self,other):
+		"""
+		adds the counts of the accumulator `other` to this one , returns self
+		"""
+		if self.fixed != other.fixed:
+			raise ValueError('kaplot: can not merge fixed and automatic histaccumulators')
+		if self.fixed:
+			if len(self.edges) != len(other.edges) or not np.allclose(self.edges,other.edges):
+				raise ValueError('kaplot: merged histaccumulators must share the same edges')
+			self.counts += other.counts
+		elif other.width is not None:
+			if self.width is None:
+				self.width 	= other.width
+				self.lo 	= other.lo
+				self.counts = other.counts.copy()
+			else:
+				other = other.copy()
+				width = max(self.width,other.width)
+				self._coarsen(width)
+				other._coarsen(width)
+				self._cover(other.lo,other.lo + len(other.counts) - 1)
+				# covering may have coarsened self further
+				other._coarsen(self.width)
+				self.counts[other.lo - self.lo:other.lo - self.lo + len(other.counts)] += other.counts
+		self.n 		+= other.n
+		self.nan 	+= other.nan
+		self.under 	+= other.under
+		self.over 	+= other.over
+		return self
+
+	def __iadd__(self,other):
+		return self.merge(other)
+
+	def copy(self):
+		"""
+		returns an independent copy of the accumulator
+		"""
+		new = histaccumulator.__new__(histaccumulator)
+		new.__dict__.update(self.__dict__)
+		new.counts = self.counts.copy()
+		return new
+
+	def histogram(self):
+		"""
+		returns (counts , edges) , for automatic edges the empty outer bins are trimmed
+		"""
+		if self.fixed:
+			return self.counts.copy() , self.edges.copy()
+		if self.width is None:
+			return np.zeros(0,dtype=np.int64) , np.zeros(0)
+		nz = np.flatnonzero(self.counts)
+		first , last = nz[0] , nz[-1] + 1
+		edges = (self.lo + np.arange(first,last + 1)) * self.width
+		return self.counts[first:last].copy() , edges
+
+def merge_accumulators(accs):
+	"""
+	merges an iterable of histaccumulators into a new accumulator
+	"""
+	accs 	= list(accs)
+	total 	= accs[0].copy()
+	for acc in accs[1:]:
+		total.merge(acc)
+	return total
+
+def aligned_histograms(accs):
+	"""
+	returns a list of (counts , edges) , one for every accumulator in `accs` , on a single
+	common grid so they can share a hist layer. automatic accumulators are coarsened to the
+	widest bin width of the group and padded to the union of their ranges, fixed ones are
+	returned as is.
+	"""
+	auto = [acc for acc in accs if not acc.fixed and acc.width is not None]
+	if not auto:
+		return [acc.histogram() for acc in accs]
+	width 	= max(acc.width for acc in auto)
+	lo 		= min(int(np.floor(acc.lo * acc.width / width)) for acc in auto)
+	hi 		= max(int(np.floor((acc.lo + len(acc.counts) - 1) * acc.width / width)) for acc in auto)
+	nbins 	= hi - lo + 1
+	grid 	= []
+	for acc in auto:
+		acc = acc.copy()
+		acc._regrid(width,lo,nbins)
+		grid.append(acc.counts)
+	# trim the bins which are empty in every accumulator
+	nz 		= np.flatnonzero(np.sum(grid,axis=0))
+	first 	= nz[0] if len(nz) else 0
+	last 	= nz[-1] + 1 if len(nz) else 0
+	edges 	= (lo + np.arange(first,last + 1)) * width
+	grid 	= iter(grid)
+	out 	= []
+	for acc in accs:
+		if not acc.fixed and acc.width is not None:
+			out.append((next(grid)[first:last],edges))
+		elif acc.fixed:
+			out.append(acc.histogram())
+		else:
+			out.append((np.zeros(len(edges) - 1,dtype=np.int64),edges))
+	return out
@@ -0,0 +1,122 @@
+"""
+Cache of tight layout results for saveMe().
+
+A tight layout measures the extent of every title, label and tick label with an extra draw
+pass, then moves the subplots with Figure.subplots_adjust(). Figures sharing their labels,
+fonts, tick label strings, size and layer locations get the same result, so it is computed
+once and the cached subplot parameters are applied directly afterwards.
+
+The key of a layout is a digest of :
+
+- the layer specs without the data : settings (labels, fonts, ticks, limits, location),
+  frames, tick parameters, guide lines, texts, rectangles, arrows and the data set labels
+- the tick label strings of every axes , which follow from the data limits
+- the figure size and dpi , the layout padding , the text and tick rc settings , and the
+  matplotlib version
+
+Layouts are kept in a bounded LRU cache per process ; clear_cache() empties it.
+"""
+
+from collections import OrderedDict
+import threading
+
+from .cache import fingerprint, matplotlib_version
+
+CACHE_SIZE 	= 256
+_CACHE 		= OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+# rc settings changing the size or position of text and ticks
+_RC_PREFIXES = ('font.','text.','mathtext.','axes.title','axes.label','axes.formatter','xtick.','ytick.','legend.','figure.subplot.')
+# subplot parameters set by a tight layout
+SUBPLOT_PARAMS = ['left','bottom','right','top','wspace','hspace']
+
+def auto_layout(fig):
+	"""
+	returns True if `fig` runs a tight layout itself whenever it is drawn (rc setting
+	figure.autolayout)
+	"""
+	if hasattr(fig,'get_layout_engine'):
+		from matplotlib.layout_engine import TightLayoutEngine
+		return isinstance(fig.get_layout_engine(),TightLayoutEngine)
+	return fig.get_tight_layout()
+
+def layout_key(kobj,fig,pad,dpi):
+	"""
+	returns the layout key of the kaplot object `kobj` drawn into the figure `fig` , laid
+	out with padding `pad` (None for the figure's own layout engine) and saved at `dpi`
+	"""
+	import matplotlib
+	layers = []
+	for name,settings,k in zip(kobj._LAYER_NAMES,kobj._LAYER_SETTINGS,kobj._LAYER_OBJECTS):
+		spec = dict(k.__dict__)
+		spec['DATA_LIST'] = [pd.get('label') for pd in k.DATA_LIST]
+		layers.append((name,settings,spec))
+	ticks = []
+	for ax in fig.axes:
+		for axis in [ax.xaxis,ax.yaxis]:
+			# formatted from the locators , building the tick artists here would cost as much as the layout
+			for ticker in [axis.major,axis.minor]:
+				ticks.append(ticker.formatter.format_ticks(ticker.locator()))
+	rc = dict((key,val) for key,val in matplotlib.rcParams.items() if key.startswith(_RC_PREFIXES))
+	return fingerprint(layers,ticks,kobj.PLOT_SETTINGS,tuple(fig.get_size_inches()),fig.dpi,dpi,pad,rc,matplotlib_version())
+
+def get_layout(key):
+	"""
+	returns the cached subplot parameters of `key` , or None
+	"""
+	with _CACHE_LOCK:
+		pars = _CACHE.get(key)
+		if pars is not None:
+			_CACHE.move_to_end(key)
+		return pars
+
+def layout_pars(fig):
+	"""
+	returns the subplot parameters of `fig` as a dictionary
+	"""
+	return dict((p,getattr(fig.subplotpars,p)) for p in SUBPLOT_PARAMS)
+
+def store_layout(key,fig):
+	"""
+	caches the subplot parameters of the laid out figure `fig` as `key` , returns them
+	"""
+	pars = layout_pars(fig)
+	with _CACHE_LOCK:
+		_CACHE[key] = pars
+		_CACHE.move_to_end(key)
+		while len(_CACHE) > CACHE_SIZE:
+			_CACHE.popitem(last=False)
+	return pars
+
+def apply_layout(fig,pars):
+	"""
+	applies the cached subplot parameters `pars` to `fig` , and turns off its layout engine
+	so the figure is not measured again when it is drawn. returns the layout engine , to be
+	given to restore_layout() when the figure is reused (e.g. the current pyplot figure)
+	"""
+	if hasattr(fig,'set_layout_engine'):
+		engine = fig.get_layout_engine()
+		fig.set_layout_engine('none')
+	else:
+		engine = fig.get_tight_layout()
+		fig.set_tight_layout(False)
+	fig.subplots_adjust(**pars)
+	return engine
+
+def restore_layout(fig,engine):
+	"""
+	sets the layout engine `engine` returned by apply_layout() on `fig` again
+	"""
+	if hasattr(fig,'set_layout_engine'):
+		fig.set_layout_engine(engine)
+	else:
+		fig.set_tight_layout(engine)
+	return
+
+def clear_cache():
+	"""
+	drops all cached layouts
+	"""
+	with _CACHE_LOCK:
+		_CACHE.clear()
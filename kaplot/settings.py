@@ -0,0 +1,187 @@
+"""
+Layered, copy-on-write settings for kaplot objects.
+
+The settings of a kaplot object are resolved from layers, lowest first :
+
+	kaplot.defaults.default  <-  profiles (settings passed to kaplot())  <-  object overrides
+
+- a settingsstore holds the defaults and the profiles , and merges a settings group the first
+  time it is read.
+- a stack of profile names (e.g. ['greyscale','markers']) is merged once into a frozen store ,
+  cached by the names and the modification times of the user settings files. creating a kaplot
+  object with a known stack is a dictionary lookup and copies nothing.
+- merged groups are settingsgroup objects , read only mappings. the module level default
+  dictionaries are never written to , objects can not leak settings into each other.
+- the setters write through kaplot._set_setting , which copies the one group being changed
+  onto the object (copy-on-write).
+- the dictionary groups read from a kaplot object are bound to it. writing an item of one
+  (kobj.PLOT_SETTINGS['xkcd'] = True) still works as it did before the groups were read only ,
+  but is deprecated : it warns and goes through kaplot._set_setting. list groups (_COLOR_LIST
+  ...) are tuples and can not be changed in place , pass a settings profile instead.
+"""
+
+from collections.abc import Mapping
+import threading
+import warnings
+
+class settingsgroup(Mapping):
+	"""
+	read only settings dictionary , items of a group bound to a kaplot object can still be
+	set (deprecated)
+	"""
+	__slots__ = ['_data','_owner']
+
+	def __init__(self,data,owner=None):
+		self._data 	= data
+		self._owner = owner
+
+	def __getitem__(self,key):
+		return self._data[key]
+
+	def __iter__(self):
+		return iter(self._data)
+
+	def __len__(self):
+		return len(self._data)
+
+	def __repr__(self):
+		return 'settingsgroup(%r)' % (self._data,)
+
+	def __setitem__(self,key,value):
+		if self._owner is None:
+			raise TypeError('kaplot: settings are read only , use the kaplot setters')
+		warnings.warn('kaplot: setting items of the settings groups is deprecated , use the kaplot setters or a settings profile',DeprecationWarning,stacklevel=2)
+		kobj , group = self._owner
+		kobj._set_setting(group,key,value)
+		# later reads through this group see the object's copy
+		self._data = kobj.__dict__[group]._data
+
+	def __getstate__(self):
+		return self._data
+
+	def __setstate__(self,data):
+		self._data 	= data
+		self._owner = None
+
+	def bind(self,kobj,group):
+		"""
+		returns the group bound to the settings group `group` of the kaplot object `kobj` ,
+		sharing the data without a copy
+		"""
+		return settingsgroup(self._data,(kobj,group))
+
+	def copy(self):
+		"""
+		returns a plain (writable) dictionary copy
+		"""
+		return dict(self._data)
+
+	def replace(self,**kwargs):
+		"""
+		returns a new group with the values of `kwargs` replaced
+		"""
+		data = dict(self._data)
+		data.update(kwargs)
+		return settingsgroup(data)
+
+class settingsstore(object):
+	"""
+	defaults plus profiles , merged lazily per settings group
+
+	** args **
+	default 	- dictionary of settings groups
+	profiles 	- list of dictionaries overriding (some of) the groups , in order
+	"""
+	def __init__(self,default,profiles=()):
+		self.default 	= default
+		self.profiles 	= tuple(profiles)
+		self._merged 	= {}
+		self._lock 		= threading.Lock()
+
+	def __getstate__(self):
+		state = dict(self.__dict__)
+		del state['_lock']
+		return state
+
+	def __setstate__(self,state):
+		self.__dict__.update(state)
+		self._lock = threading.Lock()
+
+	def __contains__(self,group):
+		return group in self.default
+
+	def groups(self):
+		return list(self.default)
+
+	def get(self,group):
+		"""
+		returns the merged settings group `group` , dictionaries as a settingsgroup
+		"""
+		try:
+			return self._merged[group]
+		except KeyError:
+			pass
+		value = self.default[group]
+		if isinstance(value,dict):
+			data = dict(value)
+			for profile in self.profiles:
+				if group in profile:
+					data.update(profile[group])
+			value = settingsgroup(data)
+		elif isinstance(value,list):
+			for profile in self.profiles:
+				if group in profile:
+					value = profile[group]
+			value = tuple(value)
+		else:
+			for profile in self.profiles:
+				if group in profile:
+					value = profile[group]
+		with self._lock:
+			return self._merged.setdefault(group,value)
+
+	def freeze(self):
+		"""
+		merges every settings group now , returns self
+		"""
+		for group in self.default:
+			self.get(group)
+		return self
+
+_STORES 	 = {}
+_STORES_LOCK = threading.Lock()
+_STORES_STAMP = [None]
+
+def settings_store(default,profiles,resolve,stamp=None):
+	"""
+	returns the settingsstore for `profiles` , a list of settings dictionaries and/or
+	profile names. stores made of profile names only are frozen , cached and shared.
+
+	** args **
+	default 	- dictionary of settings groups
+	profiles 	- list of dictionaries or profile names
+	resolve 	- function returning the dictionary of a profile name
+	stamp 		- key of the state the profile names are resolved from , e.g. the user
+				  settings file modification times. a new stamp drops the cached stores
+	"""
+	profiles = list(profiles)
+	if all(isinstance(p,str) for p in profiles):
+		key = tuple(profiles)
+		with _STORES_LOCK:
+			if _STORES_STAMP[0] != stamp:
+				_STORES.clear()
+				_STORES_STAMP[0] = stamp
+			store = _STORES.get(key)
+		if store is None:
+			store = settingsstore(default,[resolve(p) for p in profiles]).freeze()
+			with _STORES_LOCK:
+				store = _STORES.setdefault(key,store)
+		return store
+	return settingsstore(default,[resolve(p) if isinstance(p,str) else dict(p) for p in profiles])
+
+def clear_stores():
+	"""
+	drops the shared stores , required after the profile dictionaries were changed
+	"""
+	with _STORES_LOCK:
+		_STORES.clear()
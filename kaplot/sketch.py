@@ -0,0 +1,260 @@
+"""
+Mergeable quantile sketch for box plots of data too large to hold in memory.
+
+A quantilesketch is a KLL sketch (Karnin, Lang, Liberty 2016) fed with chunks of data (arrays,
+memory-mapped arrays or iterators over chunks). It keeps a constant number of values per group,
+about 3*k plus the 2*tail extreme values, however many values it has seen. Sketches built in
+different processes are combined with merge(); a sketch is picklable.
+
+Usage:
+
+	sk = quantilesketch()
+	sk.update_from(np.load(fname,mmap_mode='r') for fname in files)
+	kobj.set_plot_type('boxplot')
+	kobj.add_plotdata(y=sk,label='host 1')
+
+Accuracy:
+
+- the rank error of a quantile is about 1.7% of the number of values (99% confidence) for the
+  default k = 200 , and scales roughly as 1/k. a median estimate is off by at most ~1.7% of the
+  values in rank, not in value.
+- min , max , mean and count are exact , and so are the quantiles falling within the `tail`
+  smallest / largest values. whisker ends are exact when they fall within the tails , otherwise
+  they are the nearest retained sketch value and carry the same rank error as the quartiles.
+- fliers are the exact tail values beyond the whiskers. when there are more fliers than `tail`,
+  the remaining ones are represented by the sketch's own (weighted) sample, so the drawn
+  flier set is an approximation of the real one.
+
+Compactions use a seeded random generator, so identical input gives an identical sketch.
+"""
+
+import numpy as np
+
+class quantilesketch(object):
+	"""
+	KLL quantile sketch with exact extreme values
+
+	** args **
+	k 			- size of the largest compactor , sets the accuracy (rank error ~ 1/k)
+	tail 		- number of smallest and largest values kept exactly
+	seed 		- seed of the compaction random generator
+	chunksize 	- number of values added at once , bounds the temporary memory when
+				  a large (memory-mapped) array is passed to update()
+	"""
+	def __init__(self,k=200,tail=100,seed=0,chunksize=2**20):
+		if int(k) < 8:
+			raise ValueError('kaplot: quantilesketch requires k >= 8')
+		self.k 			= int(k)
+		self.tail 		= int(tail)
+		self.chunksize 	= int(chunksize)
+		self.n 			= 0
+		self.nan 		= 0
+		self.sum 		= 0.0
+		self.min 		= np.inf
+		self.max 		= -np.inf
+		self.low 		= np.zeros(0)
+		self.high 		= np.zeros(0)
+		# compactors , level h holds values of weight 2**h
+		self.levels 	= [np.zeros(0)]
+		self._rng 		= np.random.default_rng(seed)
+
+	def capacity(self,h):
+		"""
+		returns the capacity of level `h` , the top level holds k values and every level
+		below holds 2/3 of the one above
+		"""
+		depth = len(self.levels) - h - 1
+		return max(2,int(np.ceil(self.k * (2./3) ** depth)))
+
+	def update(self,data):
+		"""
+		adds values to the sketch
+
+		** args **
+		data 	- array like , memory-mapped array , or an iterator yielding chunks
+		"""
+		if not isinstance(data,(np.ndarray,list,tuple)) and hasattr(data,'__iter__'):
+			return self.update_from(data)
+		data = np.asarray(data).ravel()
+		for start in range(0,len(data),self.chunksize):
+			self._add(np.asarray(data[start:start+self.chunksize],dtype=float))
+		return self
+
+	def update_from(self,chunks):
+		"""
+		adds every chunk of the iterable `chunks` to the sketch
+		"""
+		for chunk in chunks:
+			self.update(chunk)
+		return self
+
+	def _add(self,x):
+		good = np.isfinite(x)
+		if not good.all():
+			self.nan += int(len(x) - np.count_nonzero(good))
+			x = x[good]
+		if len(x) == 0:
+			return
+		self.n 		+= len(x)
+		self.sum 	+= float(x.sum())
+		self.min 	= min(self.min,float(x.min()))
+		self.max 	= max(self.max,float(x.max()))
+		self._add_tails(x,x)
+		self.levels[0] = np.concatenate([self.levels[0],x])
+		self._compress()
+
+	def _add_tails(self,low,high):
+		"""
+		keeps the `tail` smallest and largest values , sorted
+		"""
+		t = self.tail
+		if t == 0:
+			return
+		low 	= np.concatenate([self.low,low])
+		high 	= np.concatenate([self.high,high])
+		if len(low) > t:
+			low = np.partition(low,t-1)[:t]
+		if len(high) > t:
+			high = np.partition(high,len(high)-t)[-t:]
+		self.low , self.high = np.sort(low) , np.sort(high)
+
+	def _compress(self):
+		"""
+		compacts every level holding more values than its capacity. a compaction sorts the
+		level and moves every other value , starting at a random offset , to the level above
+		with twice the weight. the total weight is preserved.
+		"""
+		h = 0
+		while h < len(self.levels):
+			level = self.levels[h]
+			if len(level) >= self.capacity(h):
+				if h + 1 == len(self.levels):
+					self.levels.append(np.zeros(0))
+				level 	= np.sort(level)
+				# an odd value out stays on this level
+				keep 	= len(level) % 2
+				offset 	= self._rng.integers(2)
+				self.levels[h+1] 	= np.concatenate([self.levels[h+1],level[offset:len(level)-keep:2]])
+				self.levels[h] 		= level[len(level)-keep:]
+			h += 1
+
+	def merge(self,other):
+		"""
+		adds the values summarized by the sketch `other` to this one , returns self
+		"""
+		while len(self.levels) < len(other.levels):
+			self.levels.append(np.zeros(0))
+		for h,level in enumerate(other.levels):
+			self.levels[h] = np.concatenate([self.levels[h],level])
+		self.n 		+= other.n
+		self.nan 	+= other.nan
+		self.sum 	+= other.sum
+		self.min 	= min(self.min,other.min)
+		self.max 	= max(self.max,other.max)
+		self._add_tails(other.low,other.high)
+		self._compress()
+		return self
+
+	def __iadd__(self,other):
+		return self.merge(other)
+
+	def copy(self):
+		"""
+		returns an independent copy of the sketch
+		"""
+		new = quantilesketch.__new__(quantilesketch)
+		new.__dict__.update(self.__dict__)
+		new.levels 	= [level.copy() for level in self.levels]
+		new._rng 	= np.random.default_rng()
+		new._rng.bit_generator.state = self._rng.bit_generator.state
+		return new
+
+	def _weighted(self):
+		"""
+		returns the sorted sketch values and their cumulative weights
+		"""
+		vals 	= np.concatenate(self.levels)
+		weights = np.concatenate([np.full(len(level),2.0**h) for h,level in enumerate(self.levels)])
+		order 	= np.argsort(vals,kind='mergesort')
+		return vals[order] , np.cumsum(weights[order])
+
+	def quantile(self,q):
+		"""
+		returns the approximate `q` quantile (0 <= q <= 1) , q may be an array
+		"""
+		if self.n == 0:
+			raise ValueError('kaplot: quantile of an empty quantilesketch')
+		q 		= np.asarray(q,dtype=float)
+		vals , cumw = self._weighted()
+		# 0-based order statistic of every requested quantile
+		ind 	= np.clip(np.ceil(q * self.n).astype(np.int64) - 1,0,self.n - 1)
+		out 	= vals[np.minimum(np.searchsorted(cumw,ind + 1,side='left'),len(vals) - 1)]
+		# exact values from the tails
+		nl , nh = len(self.low) , len(self.high)
+		if nl:
+			out = np.where(ind < nl,self.low[np.minimum(ind,nl - 1)],out)
+		if nh:
+			first 	= self.n - nh
+			out 	= np.where(ind >= first,self.high[np.clip(ind - first,0,nh - 1)],out)
+		out 	= np.where(q <= 0,self.min,np.where(q >= 1,self.max,out))
+		return out if out.ndim else float(out)
+
+	def sample(self,npoints=None):
+		"""
+		returns `npoints` values spread evenly over the distribution , k values by default
+		"""
+		npoints = min(self.n,self.k if npoints is None else int(npoints))
+		if npoints == 0:
+			return np.zeros(0)
+		return self.quantile((np.arange(npoints) + 0.5) / npoints)
+
+	def stats(self,whis=1.5,label=None):
+		"""
+		returns a box plot statistics dictionary as expected by Axes.bxp
+
+		** args **
+		whis 	- whisker reach in units of the IQR , or a (low,high) percentile pair
+		label 	- data set label
+		"""
+		q1 , med , q3 = self.quantile([0.25,0.5,0.75])
+		iqr = q3 - q1
+		if np.iterable(whis):
+			lo_f , hi_f = self.quantile(np.asarray(whis,dtype=float) / 100.)
+		else:
+			lo_f , hi_f = q1 - whis * iqr , q3 + whis * iqr
+		vals , cumw = self._weighted()
+		cand 	= np.concatenate([self.low,vals,self.high])
+		inside 	= cand[(cand >= lo_f) & (cand <= hi_f)]
+		whislo 	= inside.min() if len(inside) else q1
+		whishi 	= inside.max() if len(inside) else q3
+		fliers 	= [self.low[self.low < whislo] , self.high[self.high > whishi]]
+		# more fliers than exact tail values , the sketch values stand in for the rest
+		if len(self.low) == self.tail and self.tail and self.low[-1] < whislo:
+			fliers.append(vals[(vals > self.low[-1]) & (vals < whislo)])
+		if len(self.high) == self.tail and self.tail and self.high[0] > whishi:
+			fliers.append(vals[(vals < self.high[0]) & (vals > whishi)])
+		fliers 	= np.unique(np.concatenate(fliers))
+		notch 	= 1.57 * iqr / np.sqrt(self.n)
+		stats 	= {	'mean' 		: self.sum / self.n ,
+					'iqr' 		: iqr ,
+					'q1' 		: q1 ,
+					'med' 		: med ,
+					'q3' 		: q3 ,
+					'whislo' 	: whislo ,
+					'whishi' 	: whishi ,
+					'fliers' 	: fliers ,
+					'cilo' 		: med - notch ,
+					'cihi' 		: med + notch}
+		if label is not None:
+			stats['label'] = label
+		return stats
+
+def merge_sketches(sketches):
+	"""
+	merges an iterable of quantilesketches into a new sketch
+	"""
+	sketches 	= list(sketches)
+	total 		= sketches[0].copy()
+	for sk in sketches[1:]:
+		total.merge(sk)
+	return total
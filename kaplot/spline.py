@@ -0,0 +1,117 @@
+"""
+Batched spline fitting for line data sets added with spline=True.
+
+spline_curves() takes all the spline fits of a layer at once :
+
+- interpolating fits (sp_smooth = 0) of data sets sharing the same x values are solved as one
+  B-spline with a 2D right hand side and evaluated on the shared grid in a single call. the
+  result equals UnivariateSpline(x,y,k=k,s=0) to rounding.
+- smoothing fits use UnivariateSpline , spread over a thread pool (FITPACK releases the GIL).
+- every result is kept in a bounded LRU cache keyed on a digest of the data and the fit
+  parameters , so renders of unchanged data skip the fit altogether.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import threading
+
+import numpy as np
+from scipy.interpolate import UnivariateSpline, make_interp_spline
+
+CACHE_SIZE 	= 512
+_CACHE 		= OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def spline_curves(jobs,workers=None):
+	"""
+	fits and evaluates a list of splines
+
+	** args **
+	jobs 		- list of (x, y, order, smooth, npoints) tuples
+	workers 	- number of threads used for the smoothing fits , defaults to the
+				  number of cores
+
+	returns a list of (x_grid, y_grid) tuples , in job order. the arrays are read only
+	"""
+	jobs 	= list(jobs)
+	results = [None] * len(jobs)
+	keys 	= []
+	groups 	= OrderedDict()
+	single 	= []
+	for ind,(x,y,order,smooth,npoints) in enumerate(jobs):
+		x 		= np.ascontiguousarray(x,dtype=float)
+		y 		= np.ascontiguousarray(y,dtype=float)
+		jobs[ind] = (x,y,order,smooth,npoints)
+		xdigest = _digest(x)
+		key 	= (xdigest,_digest(y),order,smooth,npoints)
+		keys.append(key)
+		with _CACHE_LOCK:
+			if key in _CACHE:
+				_CACHE.move_to_end(key)
+				results[ind] = _CACHE[key]
+				continue
+		if smooth == 0 and len(x) > order and np.all(x[1:] > x[:-1]):
+			groups.setdefault((xdigest,order,npoints),[]).append(ind)
+		else:
+			single.append(ind)
+	for inds in groups.values():
+		for ind,curve in zip(inds,_interp_batch([jobs[i] for i in inds])):
+			results[ind] = curve
+	if single:
+		if workers is None:
+			workers = os.cpu_count() or 1
+		if workers > 1 and len(single) > 1:
+			with ThreadPoolExecutor(max_workers=min(workers,len(single))) as pool:
+				curves = list(pool.map(_fit,[jobs[i] for i in single]))
+		else:
+			curves = [_fit(jobs[i]) for i in single]
+		for ind,curve in zip(single,curves):
+			results[ind] = curve
+	with _CACHE_LOCK:
+		for key,curve in zip(keys,results):
+			_CACHE[key] = curve
+			_CACHE.move_to_end(key)
+		while len(_CACHE) > CACHE_SIZE:
+			_CACHE.popitem(last=False)
+	return results
+
+def clear_cache():
+	"""
+	drops all cached spline fits
+	"""
+	with _CACHE_LOCK:
+		_CACHE.clear()
+
+def _digest(arr):
+	return hashlib.sha1(arr.view(np.uint8)).hexdigest() + str(arr.shape)
+
+def _grid(x,npoints):
+	grid = np.linspace(x[0],x[-1],npoints)
+	grid.flags.writeable = False
+	return grid
+
+def _interp_batch(jobs):
+	"""
+	interpolating splines of several data sets sharing the same x values
+	"""
+	x , order , npoints = jobs[0][0] , jobs[0][2] , jobs[0][4]
+	grid 	= _grid(x,npoints)
+	values 	= make_interp_spline(x,np.column_stack([job[1] for job in jobs]),k=order)(grid)
+	curves 	= []
+	for col in range(values.shape[1]):
+		y = np.ascontiguousarray(values[:,col])
+		y.flags.writeable = False
+		curves.append((grid,y))
+	return curves
+
+def _fit(job):
+	"""
+	single spline fit , with the smoothing of UnivariateSpline
+	"""
+	x , y , order , smooth , npoints = job
+	grid 	= _grid(x,npoints)
+	y 		= UnivariateSpline(x,y,k=order,s=smooth)(grid)
+	y.flags.writeable = False
+	return grid , y
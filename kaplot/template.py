@@ -0,0 +1,287 @@
+"""
+Figure templates : the static parts of a kaplot figure are drawn once , the data is stamped
+onto them for every output.
+
+Usage:
+
+	kobj = kaplot()
+	kobj.set_xlabel('time','s')
+	kobj.set_ylim(min=-1,max=1)
+	kobj.add_axhline(0)
+	kobj.add_plotdata(t,signals[0],label='signal')	# placeholder , sets the style of the line
+	tmpl = figtemplate(kobj,dpi=150)
+	for i,y in enumerate(signals):
+		tmpl.update_plotdata(y=y)
+		tmpl.saveMe('signal_%d.png' % i)
+
+- the figure is drawn by makePlot() and laid out once (tight layout or figure.autolayout ,
+  from the kaplot.layout cache when possible). the layout is fixed while the template draws ,
+  the layout engine of the figure is restored after every call (in pyplot mode the figure is
+  the current pyplot figure).
+- the background is the figure drawn without the data lines and the artists drawn on top of
+  them (spines , guide lines , texts , legend ...). while the axes limits are unchanged, i.e.
+  set with set_xlim()/set_ylim() or new data within the same automatic limits, saveMe()
+  restores the background and draws only the data lines and the artists above them.
+  otherwise the figure is laid out for its new tick labels and drawn once in full.
+- .png files are written from the canvas buffer , other formats are saved with
+  Figure.savefig() from the laid out figure.
+- as for kaplot.update_plotdata() , only data sets drawn as lines of their own (no error bars
+  or line collections) are replaced.
+"""
+
+from contextlib import ExitStack, contextmanager
+
+from matplotlib.text import Text
+
+from .layout import auto_layout, layout_key, get_layout, store_layout, apply_layout, restore_layout, layout_pars
+
+class figtemplate(object):
+	"""
+	kaplot figure drawn once , saved with new data any number of times
+
+	** args **
+	kobj 	- kaplot object , its data sets are replaced with update_plotdata()
+
+	** kwargs **
+	height 		- dimension of figure, in inches
+	width 		- dimension of figure, in inches
+	dpi 		- the dots per inch of the figure
+	transparent - True/False , transparent figure background
+	"""
+	def __init__(self,kobj,**kwargs):
+		from . import update_default_kwargs
+		self.kobj 		= kobj
+		self.sf 		= update_default_kwargs(kobj.SAVEFIG_SETTINGS,kwargs)
+		kobj.makePlot()
+		self.figure 	= kobj.FIGURE
+		self._dpi 		= self.figure.dpi
+		self._auto 		= auto_layout(self.figure)
+		self._changed 	= set()
+		with self._rc(), self._frozen():
+			self.figure.set_size_inches(self.sf['width'],self.sf['height'])
+			self._layout()
+			self._capture()
+
+	def _rc(self):
+		"""
+		returns the rc context the figure is drawn in
+		"""
+		from . import figure_rc
+		if self.kobj._PYPLOT:
+			return ExitStack()
+		return figure_rc(self.kobj._DRAWN)
+
+	@contextmanager
+	def _frozen(self):
+		"""
+		turns off the layout engine of the figure while the template draws , the subplot
+		parameters of the template are set directly. the engine is restored on exit
+		"""
+		engine = apply_layout(self.figure,layout_pars(self.figure))
+		try:
+			yield
+		finally:
+			restore_layout(self.figure,engine)
+
+	def _layout(self):
+		"""
+		lays the figure out as saveMe() does , then fixes the subplot parameters so drawing
+		the figure does not measure it again
+		"""
+		fig 	= self.figure
+		tight 	= self.kobj.PLOT_SETTINGS['tight_layout']
+		fig.set_dpi(self._dpi)
+		if tight or self._auto:
+			key , pars = None , None
+			if self.kobj.PLOT_SETTINGS['layout_cache']:
+				key 	= layout_key(self.kobj,fig,0.75 if tight else None,self.sf['dpi'])
+				pars 	= get_layout(key)
+			if pars is None:
+				# tight layouts are measured at the figure dpi , figure.autolayout at the output dpi
+				if tight:
+					fig.tight_layout(pad=0.75)
+				else:
+					fig.set_dpi(self.sf['dpi'])
+					fig.tight_layout()
+				pars = store_layout(key,fig) if key is not None else layout_pars(fig)
+			apply_layout(fig,pars)
+		fig.set_dpi(self.sf['dpi'])
+		self._pars 		= layout_pars(fig)
+		self._laid_out 	= self._limits()
+		return
+
+	def _limits(self):
+		"""
+		returns the view limits of all axes
+		"""
+		return [tuple(ax.viewLim.bounds) for ax in self.figure.axes]
+
+	def _capture(self):
+		"""
+		draws the figure without its data lines and the artists above them , and keeps the
+		image as the background
+		"""
+		fig 	= self.figure
+		data 	= set(a for ind in range(len(self.kobj._LIVE)) for a in self.kobj._live_artists(ind))
+		self._top , self._background = [] , None
+		if not data or not hasattr(fig.canvas,'copy_from_bbox'):
+			return
+		holders = set(a.axes for a in data)
+		order 	= draw_order(fig,data)[0]
+		first 	= min(i for i,a in enumerate(order) if a in data or a in holders)
+		self._top = order[first:]
+		visible = [a.get_visible() for a in self._top]
+		for a in self._top:
+			a.set_visible(False)
+		try:
+			fig.canvas.draw()
+			self._background = fig.canvas.copy_from_bbox(fig.bbox)
+		finally:
+			for a,vis in zip(self._top,visible):
+				a.set_visible(vis)
+		# the axes place their titles when drawn , clear of the tick labels hidden above
+		fig.canvas.draw()
+		self._texts = [(a,a.get_position()) for a in self._top if isinstance(a,Text)]
+		self._bg_limits = self._limits()
+		self._bg_pars 	= self._pars
+		return
+
+	def _place_titles(self):
+		"""
+		moves the texts drawn on top of the background (the titles) back to their positions
+		in the full draw of the background layout
+		"""
+		for a,pos in self._texts:
+			a.set_position(pos)
+		return
+
+	def update_plotdata(self,x=None,y=None,index=-1,name='main',**kwargs):
+		"""
+		replaces the data of a data set of the template , see kaplot.update_plotdata()
+
+		** args **
+		x 		- new x data , None keeps the current values
+		y 		- new y data , None keeps the current values
+
+		** kwargs **
+		name 	- layer name
+		index 	- position of the data set in the layer , in add_plotdata() order. defaults
+				  to the last data set
+		"""
+		kobj 	= self.kobj
+		if name.lower() not in kobj._LAYER_NAMES:
+			raise AttributeError('No layer/axes named %s' % name)
+		ind 	= kobj._LAYER_NAMES.index(name.lower())
+		n 		= len(kobj._LAYER_OBJECTS[ind].DATA_LIST)
+		if -n <= index < n and index % n not in kobj._LIVE[ind]:
+			print('kaplot: figtemplate error. data set %s of layer %s is not drawn as a line.' % (index,name))
+			return
+		kobj._PLAN = None
+		if kobj._update_series(ind,name,x,y,index,**kwargs):
+			self._changed.add(ind)
+		return
+
+	def _update_view(self):
+		"""
+		updates the automatic limits of the axes with new data , and the layout when the
+		limits (and so the tick labels) changed. returns True when the background is valid
+		"""
+		fig 	= self.figure
+		for ind in self._changed:
+			ax = self.kobj._LAYER_PLT_OBJECT[ind]
+			ax.relim()
+			ax.autoscale_view()
+		self._changed = set()
+		limits 	= self._limits()
+		if self._background is not None and limits == self._bg_limits:
+			if self._laid_out != limits:
+				# the figure was laid out for other limits since the capture
+				apply_layout(fig,self._bg_pars)
+				self._place_titles()
+				self._laid_out = limits
+			return True
+		if self._laid_out != limits:
+			self._layout()
+		return False
+
+	def draw(self):
+		"""
+		draws the figure with the current data into its canvas , returns True when only the
+		data (and the artists above it) had to be drawn
+		"""
+		with self._rc(), self._frozen():
+			if self._update_view():
+				self._draw_top()
+				return True
+			self.figure.canvas.draw()
+		return False
+
+	def _draw_top(self):
+		"""
+		restores the background and draws the data lines and the artists above them
+		"""
+		canvas 		= self.figure.canvas
+		renderer 	= canvas.get_renderer()
+		canvas.restore_region(self._background)
+		for a in self._top:
+			a.draw(renderer)
+		return
+
+	def saveMe(self,fname,format=None):
+		"""
+		saves the figure with the current data to file `fname`
+
+		** args **
+		fname 	- path/filename to save to
+		format 	- file format , defaults to the extension of `fname`
+		"""
+		import os
+		import matplotlib
+		from kaplot_backend import output_backend
+		fig 	= self.figure
+		fmt 	= format
+		if fmt is None and not hasattr(fname,'write'):
+			fmt = os.path.splitext(os.fspath(fname))[1][1:]
+		fmt 	= (fmt or matplotlib.rcParams['savefig.format']).lower()
+		sf 		= dict((key,val) for key,val in self.sf.items() if key not in ['width','height'])
+		sf['format'] = fmt
+		if 'backend' not in sf and output_backend(fname,fmt) is not None:
+			sf['backend'] = output_backend(fname,fmt)
+		with self._rc(), self._frozen():
+			if self._buffer_output(fmt):
+				from matplotlib.image import imsave
+				self.draw()
+				imsave(fname,fig.canvas.buffer_rgba(),format='png',origin='upper',dpi=fig.dpi)
+				return
+			self._update_view()
+			fig.savefig(fname,**sf)
+		return
+
+	def _buffer_output(self,fmt):
+		"""
+		returns True if a `fmt` file is written from the canvas buffer as savefig() would write it
+		"""
+		from . import buffer_matches_savefig
+		return fmt == 'png' and buffer_matches_savefig(self.figure,self.sf)
+
+def draw_order(fig,data):
+	"""
+	returns the artists of `fig` in the order a draw paints them , and the axes holding the
+	first of the `data` artists. that axes is listed by its own artists , every other axes as
+	one artist
+	"""
+	children 	= [a for a in fig.get_children() if a is not fig.patch and not a.get_animated()]
+	order 		= []
+	expanded 	= None
+	for a in sorted(children,key=lambda a: a.get_zorder()):
+		if expanded is None and a in fig.axes and any(getattr(d,'axes',None) is a for d in data):
+			expanded 	= a
+			artists 	= [c for c in a.get_children() if c is not a.patch and not c.get_animated()]
+			if not (a.axison and a.get_frame_on()):
+				artists = [c for c in artists if c not in a.spines.values()]
+			if not a.axison:
+				artists = [c for c in artists if c not in [a.xaxis,a.yaxis]]
+			order.extend(sorted(artists,key=lambda c: c.get_zorder()))
+		else:
+			order.append(a)
+	return order , expanded
@@ -7,31 +7,119 @@ Usage:
 	set_backend('BACKEND')
 	import kaplot
 
-Allowed backends include:
+Allowed backends are the matplotlib builtin backends, for example:
 
+- agg
 - pdf
+- svg
 - macosx
-- agg
+- tkagg
 - wxagg (requires wx module)
 
+and third party backends given as 'module://name'. The backend is applied before pyplot is
+imported ; without a selection, matplotlib picks its default , except on linux without a
+display (DISPLAY / WAYLAND_DISPLAY unset) where Agg is used, so no GUI toolkit is loaded.
+The MPLBACKEND environment variable takes precedence over this default.
+
+Vector outputs skip the raster pipeline : saveMe() writes .pdf, .svg, .eps and .ps files
+with the matching vector backend directly, whichever backend draws the figure. Use
+set_output_backend() to change the backend used for a file format , e.g.
+
+	set_output_backend('pdf','pgf')
+
 Refer to [matplotlib documentation](http://matplotlib.org/faq/usage_faq.html#what-is-a-backend) for more information.
 """
 
+import os
+import sys
+
+# matplotlib builtin backends
+BACKENDS = [	'agg' , 'cairo' , 'pdf' , 'pgf' , 'ps' , 'svg' , 'template' , \
+				'gtk3agg' , 'gtk3cairo' , 'gtk4agg' , 'gtk4cairo' , 'macosx' , 'nbagg' , 'notebook' , \
+				'qtagg' , 'qtcairo' , 'qt5agg' , 'qt5cairo' , 'tkagg' , 'tkcairo' , 'webagg' , \
+				'wx' , 'wxagg' , 'wxcairo']
+
+# vector backend used to save each file format
+_OUTPUT = {	'pdf'	:	'pdf' , \
+			'svg'	:	'svg' , \
+			'svgz'	:	'svg' , \
+			'eps'	:	'ps'  , \
+			'ps'	:	'ps'}
+
 _backend = None
 
+def validate_backend(backend):
+	"""
+	returns the normalized name of `backend` , raises ValueError for unknown backends
+	"""
+	if not isinstance(backend,str):
+		raise ValueError('kaplot: backend must be a string , not %r' % (backend,))
+	if backend.startswith('module://'):
+		return backend
+	if backend.lower() not in BACKENDS:
+		raise ValueError('kaplot: unknown backend %r , use one of %s or module://name' % (backend,', '.join(BACKENDS)))
+	return backend.lower()
+
 def set_backend(backend):
 	"""
-	Switches the backend variable to what is passed by the user.
+	Switches the backend variable to what is passed by the user. When matplotlib is already
+	imported the backend is applied right away.
 
-	TODO: Have some level of error checking here.
+	** args **
+	backend 	- backend name, None restores the default
 	"""
 	global _backend
+	if backend is not None:
+		backend = validate_backend(backend)
+		if 'matplotlib' in sys.modules:
+			sys.modules['matplotlib'].use(backend)
 	_backend = backend
 	return
 
 def get_backend():
 	"""
-	Returns the currently selected backend.
+	Returns the currently selected backend, Agg when nothing was selected and no display is
+	available, None to leave the choice to matplotlib.
 	"""
-	global _backend
-	return _backend
\ No newline at end of file
+	if _backend is not None:
+		return _backend
+	if os.environ.get('MPLBACKEND') or has_display():
+		return None
+	return 'agg'
+
+def has_display():
+	"""
+	Returns False on linux/unix when neither an X11 nor a Wayland display is set
+	"""
+	if sys.platform.startswith('win') or sys.platform == 'darwin':
+		return True
+	return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def set_output_backend(fmt,backend):
+	"""
+	Selects the backend used to save files of format `fmt`
+
+	** args **
+	fmt 		- file format (extension), e.g. 'pdf'
+	backend 	- backend name, None saves with the backend drawing the figure
+	"""
+	fmt = fmt.lower().lstrip('.')
+	if backend is None:
+		_OUTPUT.pop(fmt,None)
+	else:
+		_OUTPUT[fmt] = validate_backend(backend)
+	return
+
+def output_backend(fname,fmt=None):
+	"""
+	Returns the backend used to save `fname` , None when the figure's own canvas saves it
+
+	** args **
+	fname 	- file name (or file object)
+	fmt 	- file format , overrides the extension of `fname`
+	"""
+	if fmt is None:
+		if not isinstance(fname,(str,os.PathLike)):
+			return None
+		fmt = os.path.splitext(os.fspath(fname))[1]
+	return _OUTPUT.get(fmt.lower().lstrip('.'))
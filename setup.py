@@ -8,7 +8,7 @@ setup(
 	name = 'kaplot',
 	version = __version__,
 	packages = find_packages(),
-	install_requires = ['scipy','numpy','matplotlib','decorator'],
+	install_requires = ['scipy','numpy','matplotlib'],
 
 	author = 'Kamil Mielczarek',
 	author_email = 'kamil.m@gmail.com',